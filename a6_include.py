@@ -1,9 +1,22 @@
 # Course:      CS261 - Data Structures
 # Assignment:  6
-# Description: Provided data structures necessary to complete the assignment.
-#              Please look through this file carefully to see what methods
-#              are available and how they're implemented.
-#              Don't modify the contents of this file.
+# Description: Shared data structures and helpers for both HashMaps: DynamicArray; hash
+#              functions (hash_function_1/2, FNV-1a, SipHash, BLAKE2b, vectorized batch
+#              hashing with hash_keys), mix_hash and MixedHash, the seeded KeyedHash, and the
+#              HASH_FUNCTIONS registry; HashMapStats; HashMapIterator and the keys/values/items
+#              views; pack_ints/unpack_ints and dump_map/load_map for pickling tables; and the
+#              slotted SLNode and LinkedList (separate chaining) and HashEntry (open addressing).
+
+import hashlib
+import os
+import pickle
+import struct
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
@@ -16,7 +29,7 @@ class DynamicArray:
     """
     Class implementing a Dynamic Array
     Supported methods are:
-    append, pop, swap, get_at_index, set_at_index, length
+    append, pop, swap, get_at_index, set_at_index, fill, length, storage
     """
 
     def __init__(self, arr=None) -> None:
@@ -49,6 +62,13 @@ class DynamicArray:
         """Remove element from end of the array and return it."""
         return self._data.pop()
 
+    def fill(self, value: object, length: int = None) -> None:
+        """
+        Set every element to value in one slice assignment, first growing or
+        shrinking the array to length if given. The array keeps its storage.
+        """
+        self._data[:] = [value] * (len(self._data) if length is None else length)
+
     def swap(self, i: int, j: int) -> None:
         """Swap two elements in array given their indices."""
         self._data[i], self._data[j] = self._data[j], self._data[i]
@@ -77,6 +97,14 @@ class DynamicArray:
         """Return length of array."""
         return len(self._data)
 
+    def storage(self) -> list:
+        """
+        Return the list backing the array, for hot loops that index it directly
+        without bounds checks. Callers may read and set elements but must not
+        change its length.
+        """
+        return self._data
+
 
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
@@ -96,6 +124,448 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+def _code_points(keys) -> "np.ndarray":
+    """
+    Return a 2-D int64 array of the code points of a NumPy unicode array,
+    one row per key, padded with zeros to the longest key
+    """
+    keys = np.ascontiguousarray(keys)
+    return keys.view(np.uint32).reshape(len(keys), -1).astype(np.int64)
+
+
+def _hash_function_1_array(keys) -> "np.ndarray":
+    """Vectorized hash_function_1 over a NumPy unicode array"""
+    return _code_points(keys).sum(axis=1)
+
+
+def _hash_function_2_array(keys) -> "np.ndarray":
+    """Vectorized hash_function_2 over a NumPy unicode array"""
+    codes = _code_points(keys)
+    return codes @ np.arange(1, codes.shape[1] + 1, dtype=np.int64)
+
+
+# array implementations of hash functions, used by hash_keys()
+_VECTORIZED_HASHES = {
+    hash_function_1: _hash_function_1_array,
+    hash_function_2: _hash_function_2_array,
+}
+
+
+def hash_keys(function, keys) -> tuple:
+    """
+    Hash a whole batch of keys in one pass.
+    NumPy unicode arrays are hashed with a vectorized implementation of
+    function when one exists; anything else is hashed key by key.
+    Return a tuple of (list of keys, list of hashes).
+    """
+    if np is not None and isinstance(keys, np.ndarray):
+        vectorized = _VECTORIZED_HASHES.get(function)
+        if vectorized is not None and keys.dtype.kind == 'U' and keys.ndim == 1 and len(keys):
+            return keys.tolist(), vectorized(keys).tolist()
+        keys = keys.tolist()
+    else:
+        keys = list(keys)
+    return keys, [function(key) for key in keys]
+
+
+# ------------ Additional hash functions and registry ------------ #
+
+_MASK_64 = (1 << 64) - 1
+
+# 128 bits of per-process randomness for the seeded hash functions below;
+# their values are stable within a process but differ between processes
+_PROCESS_SEED = os.urandom(16)
+_PROCESS_K0 = int.from_bytes(_PROCESS_SEED[:8], 'little')
+_PROCESS_K1 = int.from_bytes(_PROCESS_SEED[8:], 'little')
+
+
+def _key_bytes(key) -> bytes:
+    """Return the bytes a byte-oriented hash function consumes for key."""
+    if isinstance(key, (bytes, bytearray, memoryview)):
+        return bytes(key)
+    return str(key).encode('utf-8', 'surrogatepass')
+
+
+def hash_builtin(key) -> int:
+    """Built-in hash() of key, mixed with a per-process seed"""
+    return hash((_PROCESS_K0, key)) & _MASK_64
+
+
+def hash_fnv1a(key) -> int:
+    """64-bit FNV-1a over the UTF-8 bytes of key"""
+    hash = 0xcbf29ce484222325
+    for byte in _key_bytes(key):
+        hash = ((hash ^ byte) * 0x100000001b3) & _MASK_64
+    return hash
+
+
+def siphash24(data: bytes, k0: int, k1: int) -> int:
+    """SipHash-2-4 of data under the 128-bit key (k0, k1)"""
+    v0 = k0 ^ 0x736f6d6570736575
+    v1 = k1 ^ 0x646f72616e646f6d
+    v2 = k0 ^ 0x6c7967656e657261
+    v3 = k1 ^ 0x7465646279746573
+
+    def rounds(count, v0, v1, v2, v3):
+        for _ in range(count):
+            v0 = (v0 + v1) & _MASK_64
+            v1 = ((v1 << 13) | (v1 >> 51)) & _MASK_64 ^ v0
+            v0 = ((v0 << 32) | (v0 >> 32)) & _MASK_64
+            v2 = (v2 + v3) & _MASK_64
+            v3 = ((v3 << 16) | (v3 >> 48)) & _MASK_64 ^ v2
+            v0 = (v0 + v3) & _MASK_64
+            v3 = ((v3 << 21) | (v3 >> 43)) & _MASK_64 ^ v0
+            v2 = (v2 + v1) & _MASK_64
+            v1 = ((v1 << 17) | (v1 >> 47)) & _MASK_64 ^ v2
+            v2 = ((v2 << 32) | (v2 >> 32)) & _MASK_64
+        return v0, v1, v2, v3
+
+    length = len(data)
+    tail = length - length % 8
+    for i in range(0, tail, 8):
+        m = int.from_bytes(data[i:i + 8], 'little')
+        v3 ^= m
+        v0, v1, v2, v3 = rounds(2, v0, v1, v2, v3)
+        v0 ^= m
+
+    m = ((length & 0xff) << 56) | int.from_bytes(data[tail:], 'little')
+    v3 ^= m
+    v0, v1, v2, v3 = rounds(2, v0, v1, v2, v3)
+    v0 ^= m
+
+    v2 ^= 0xff
+    v0, v1, v2, v3 = rounds(4, v0, v1, v2, v3)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+def hash_siphash(key) -> int:
+    """SipHash-2-4 of the UTF-8 bytes of key under a per-process seed"""
+    return siphash24(_key_bytes(key), _PROCESS_K0, _PROCESS_K1)
+
+
+def hash_blake2b(key) -> int:
+    """64-bit keyed BLAKE2b of the UTF-8 bytes of key under a per-process seed"""
+    digest = hashlib.blake2b(_key_bytes(key), digest_size=8, key=_PROCESS_SEED).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def mix_hash(hash: int) -> int:
+    """
+    Finalize a hash with the MurmurHash3 64-bit mixer so every input bit
+    affects the low bits, which is what a power-of-two table indexes by.
+    The mix is a bijection on 64-bit values, so distinct hashes stay distinct.
+    """
+    hash &= _MASK_64
+    hash = ((hash ^ (hash >> 33)) * 0xff51afd7ed558ccd) & _MASK_64
+    hash = ((hash ^ (hash >> 33)) * 0xc4ceb9fe1a85ec53) & _MASK_64
+    return hash ^ (hash >> 33)
+
+
+class MixedHash:
+    """
+    Hash function wrapper that finalizes the wrapped function's hashes
+    with mix_hash(), used by power-of-two HashMaps.
+    """
+
+    def __init__(self, function) -> None:
+        """Initialize wrapper around a hash function."""
+        self.function = function
+
+    def __call__(self, key) -> int:
+        """Return the mixed hash of key."""
+        return mix_hash(self.function(key))
+
+
+class KeyedHash:
+    """
+    Hash function with a seed of its own: 64-bit keyed BLAKE2b of the UTF-8 bytes
+    of a key. Without the seed nobody can pick keys that collide, so a HashMap
+    hashing with it can't be flooded. Instances with equal seeds hash alike and
+    compare equal, also after pickling.
+    """
+
+    def __init__(self, seed: bytes = None) -> None:
+        """Initialize keyed hash function with a seed of up to 64 bytes, random if None."""
+        self.seed = os.urandom(16) if seed is None else seed
+
+    def __call__(self, key) -> int:
+        """Return the keyed hash of key."""
+        digest = hashlib.blake2b(_key_bytes(key), digest_size=8, key=self.seed).digest()
+        return int.from_bytes(digest, 'little')
+
+    def __eq__(self, other) -> bool:
+        """Return True if other is a KeyedHash with the same seed."""
+        return isinstance(other, KeyedHash) and other.seed == self.seed
+
+    def __hash__(self) -> int:
+        """Return hash of the seed."""
+        return hash(self.seed)
+
+
+# hash functions selectable by name in the HashMap constructors
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'builtin': hash_builtin,
+    'fnv1a': hash_fnv1a,
+    'siphash': hash_siphash,
+    'blake2b': hash_blake2b,
+}
+
+# registered names whose hashes are the same in every process, as needed
+# by data that is hashed in one process and read in another
+DETERMINISTIC_HASH_FUNCTIONS = ('hash_function_1', 'hash_function_2', 'fnv1a')
+
+
+def get_hash_function(function):
+    """
+    Return the hash function registered under a name, or function itself
+    if it is already callable. Raise ValueError for an unknown name.
+    """
+    if not isinstance(function, str):
+        return function
+    try:
+        return HASH_FUNCTIONS[function]
+    except KeyError:
+        raise ValueError(f"unknown hash function {function!r}, "
+                         f"expected one of {', '.join(HASH_FUNCTIONS)}") from None
+
+
+def register_hash_function(name: str, function) -> None:
+    """Make function selectable by name in the HashMap constructors."""
+    HASH_FUNCTIONS[name] = function
+
+
+class HashMapStats:
+    """
+    Opt-in operation statistics for a hash map.
+    Records the probe count (OA) or chain traversal length (SC) of every
+    operation into a fixed-size histogram per operation, plus the longest
+    chain seen and resize count and time. Recording is a handful of integer
+    updates, cheap enough to leave enabled.
+    """
+
+    # lengths 0 to HISTOGRAM_SIZE - 2 are counted exactly, the last bin holds the rest
+    HISTOGRAM_SIZE = 33
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.operations = {}
+        self.total_lengths = {}
+        self.histograms = {}
+        self.max_length = 0
+        self.max_chain_length = 0
+        self.resizes = 0
+        self.resize_seconds = 0.0
+
+    def record(self, operation: str, length: int) -> None:
+        """Record one operation that probed or traversed length slots or nodes."""
+        histogram = self.histograms.get(operation)
+        if histogram is None:
+            histogram = self.histograms[operation] = [0] * self.HISTOGRAM_SIZE
+            self.operations[operation] = 0
+            self.total_lengths[operation] = 0
+
+        histogram[min(length, self.HISTOGRAM_SIZE - 1)] += 1
+        self.operations[operation] += 1
+        self.total_lengths[operation] += length
+        if length > self.max_length:
+            self.max_length = length
+
+    def record_chain(self, length: int) -> None:
+        """Record the length of a chain after an insert."""
+        if length > self.max_chain_length:
+            self.max_chain_length = length
+
+    def record_resize(self, seconds: float, new: bool = True) -> None:
+        """
+        Record seconds spent resizing. new is False for later steps of an
+        incremental resize that was already counted.
+        """
+        if new:
+            self.resizes += 1
+        self.resize_seconds += seconds
+
+    def as_dict(self) -> dict:
+        """Return a plain dict snapshot suitable for a metrics pipeline."""
+        return {
+            'operations': dict(self.operations),
+            'mean_lengths': {operation: self.total_lengths[operation] / count
+                             for operation, count in self.operations.items()},
+            'histograms': {operation: list(histogram)
+                           for operation, histogram in self.histograms.items()},
+            'max_length': self.max_length,
+            'max_chain_length': self.max_chain_length,
+            'resizes': self.resizes,
+            'resize_seconds': self.resize_seconds,
+        }
+
+
+class HashMapIterator:
+    """
+    Separate iterator class for the HashMaps.
+    Each iterator keeps its own position, so nested loops and several threads
+    can walk the same map. A map counts its structural modifications (keys
+    added or removed, table rebuilt) in _mod_count; the iterator raises
+    RuntimeError if that count changes while it is in use. Overwriting the
+    value of an existing key is not a structural modification.
+    """
+
+    def __init__(self, hash_map, entries, project=None) -> None:
+        """
+        Initialize the iterator given a map, a generator of its entries and
+        an optional function applied to every entry before it is returned.
+        """
+        self._map = hash_map
+        self._mod_count = hash_map._mod_count
+        self._entries = entries
+        self._project = project
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator."""
+        return self
+
+    def __next__(self):
+        """Obtain next entry and advance iterator."""
+        if self._map._mod_count != self._mod_count:
+            raise RuntimeError("HashMap modified during iteration")
+
+        entry = next(self._entries)
+        if self._project is None:
+            return entry
+        return self._project(entry)
+
+
+class KeysView:
+    """
+    Lazy view of a HashMap's keys. Iterating walks the buckets in place
+    instead of copying them; the view reflects later changes to the map.
+    """
+
+    def __init__(self, hash_map) -> None:
+        """Initialize view of given map."""
+        self._map = hash_map
+
+    def __len__(self) -> int:
+        """Return size of the map."""
+        return self._map.get_size()
+
+    def __iter__(self) -> HashMapIterator:
+        """Return a new iterator over the map."""
+        return HashMapIterator(self._map, self._map._entries(), self._project)
+
+    @staticmethod
+    def _project(entry):
+        """Return the part of an entry the view shows."""
+        return entry.key
+
+    def __contains__(self, key) -> bool:
+        """Return True if key is in the map."""
+        return self._map.contains_key(key)
+
+
+class ValuesView(KeysView):
+    """
+    Lazy view of a HashMap's values.
+    """
+
+    @staticmethod
+    def _project(entry):
+        """Return the part of an entry the view shows."""
+        return entry.value
+
+    def __contains__(self, value) -> bool:
+        """Return True if value is in the map, by walking it."""
+        return any(value is item or value == item for item in self)
+
+
+class ItemsView(KeysView):
+    """
+    Lazy view of a HashMap's (key, value) pairs.
+    """
+
+    @staticmethod
+    def _project(entry):
+        """Return the part of an entry the view shows."""
+        return entry.key, entry.value
+
+    def __contains__(self, item) -> bool:
+        """Return True if the (key, value) pair is in the map."""
+        key, value = item
+        if not self._map.contains_key(key):
+            return False
+        found = self._map.get(key)
+        return value is found or value == found
+
+
+# ------------------------ Serialization ------------------------- #
+
+# binary dump file: magic, pickle length, buffer count, pickle protocol 5
+# stream, then every out-of-band buffer as a length and its raw bytes
+DUMP_MAGIC = b'A6DUMP01'
+_DUMP_HEADER = struct.Struct('<8sQI')
+_DUMP_LENGTH = struct.Struct('<Q')
+
+
+def pack_ints(values, protocol: int):
+    """
+    Pack non-negative integers below 2**64, such as cached hashes or slot
+    indices, into an unsigned 64-bit array for pickling. Under protocol 5
+    the array is wrapped in a PickleBuffer so it can be sent out-of-band.
+    Values that don't fit are returned as a plain list.
+    """
+    try:
+        packed = array('Q', values)
+    except OverflowError:
+        return list(values)
+    return pickle.PickleBuffer(packed) if protocol >= 5 else packed
+
+
+def unpack_ints(packed):
+    """Return the integers packed by pack_ints() as a sequence."""
+    if isinstance(packed, (list, array)):
+        return packed
+    values = array('Q')
+    values.frombytes(memoryview(packed).cast('B'))
+    return values
+
+
+def dump_map(hash_map, file) -> None:
+    """
+    Write a HashMap to a binary file object as a pickle protocol 5 stream
+    followed by its out-of-band buffers, so the packed bucket layout is
+    written as raw bytes instead of being copied into the pickle.
+    """
+    buffers = []
+    data = pickle.dumps(hash_map, protocol=5, buffer_callback=buffers.append)
+    file.write(_DUMP_HEADER.pack(DUMP_MAGIC, len(data), len(buffers)))
+    file.write(data)
+    for buffer in buffers:
+        raw = buffer.raw()
+        file.write(_DUMP_LENGTH.pack(raw.nbytes))
+        file.write(raw)
+
+
+def load_map(file):
+    """
+    Read a HashMap written by dump_map() from a binary file object.
+    Raise ValueError if the file doesn't hold a dump.
+    """
+    header = file.read(_DUMP_HEADER.size)
+    if len(header) != _DUMP_HEADER.size:
+        raise ValueError("not a hash map dump")
+    magic, length, count = _DUMP_HEADER.unpack(header)
+    if magic != DUMP_MAGIC:
+        raise ValueError("not a hash map dump")
+
+    data = file.read(length)
+    buffers = []
+    for _ in range(count):
+        size, = _DUMP_LENGTH.unpack(file.read(_DUMP_LENGTH.size))
+        buffers.append(file.read(size))
+    return pickle.loads(data, buffers=buffers)
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -103,11 +573,20 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    # slots instead of a per-node __dict__: a map holds one node per entry
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash: int = None) -> None:
+        """
+        Initialize node given a key and value.
+        hash is the full (unreduced) hash of the key, cached so that
+        lookups and resizes never need to call the hash function again.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -119,6 +598,8 @@ class LinkedListIterator:
     Separate iterator class for LinkedList
     """
 
+    __slots__ = ('_node',)
+
     def __init__(self, current_node: SLNode) -> None:
         """Initialize the iterator with a node."""
         self._node = current_node
@@ -141,9 +622,11 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, link, remove, pop, contains, search, length, iterator
     """
 
+    __slots__ = ('_head', '_size')
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -168,20 +651,33 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
-        """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+    def insert(self, key: str, value: object, hash: int = None) -> SLNode:
+        """Insert new node at front of the list and return it."""
+        self._head = SLNode(key, value, self._head, hash)
         self._size += 1
+        return self._head
 
-    def remove(self, key: str) -> bool:
+    def link(self, node: SLNode) -> SLNode:
+        """
+        Insert an existing node at front of the list and return it.
+        The node is relinked, not copied, so it must be unlinked from
+        any list that is still in use.
+        """
+        node.next = self._head
+        self._head = node
+        self._size += 1
+        return node
+
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If hash is given, stored hashes are compared before keys.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -192,11 +688,47 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def pop(self, key: str, hash: int = None) -> tuple:
+        """
+        Unlink first node with matching key in a single traversal.
+        Return a tuple of (removed node or None, number of nodes visited).
+        If hash is given, stored hashes are compared before keys.
+        """
+        previous, node, visited = None, self._head, 0
+        while node:
+            visited += 1
+            if (hash is None or node.hash == hash) and node.key == key:
+                if previous:
+                    previous.next = node.next
+                else:
+                    self._head = node.next
+                self._size -= 1
+                return node, visited
+
+            previous, node = node, node.next
+        return None, visited
+
+    def search(self, key: str, hash: int = None) -> tuple:
+        """
+        Return a tuple of (node with matching key or None, number of nodes visited).
+        If hash is given, stored hashes are compared before keys.
+        """
+        node, visited = self._head, 0
+        while node:
+            visited += 1
+            if (hash is None or node.hash == hash) and node.key == key:
+                return node, visited
+            node = node.next
+        return None, visited
+
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If hash is given, stored hashes are compared before keys.
+        """
         node = self._head
         while node:
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 return node
             node = node.next
         return node
@@ -210,10 +742,18 @@ class LinkedList:
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    # slots instead of a per-entry __dict__: a map holds one entry per key
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
+
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map.
+        hash is the full (unreduced) hash of the key, cached so that
+        probing and resizes never need to call the hash function again.
+        """
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -0,0 +1,839 @@
+# Name: Aubrey Floyd
+# Course: CS261 - Data Structures
+# Description: Benchmarks for the HashMap implementations and the hash functions they use.
+#              Each benchmark is a subcommand, e.g.
+#                  python hash_map_bench.py hashes --size 20000
+#              and prints a table, or JSON with --json.
+#                  python hash_map_bench.py threads --threads 1 2 4 8 --shards 1 4 16
+#                  python hash_map_bench.py sketch --size 100000 --epsilons 0.01 0.001
+#                  python hash_map_bench.py suite --output results.json --compare baseline.json
+#                  python hash_map_bench.py memory --size 1000000
+#                  python hash_map_bench.py anagrams --size 20000 --groups 4
+#                  python hash_map_bench.py flood --size 5000
+#                  python hash_map_bench.py parallel --size 300000 --workers 1 2 4
+
+import argparse
+import itertools
+import json
+import os
+import random
+import string
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+from a6_include import HASH_FUNCTIONS
+import hash_map_oa
+import hash_map_parallel
+import hash_map_sc
+import hash_map_sharded
+import hash_map_sketch
+
+
+# ------------------------- key sets ------------------------------------- #
+
+def make_key_sets(size: int, seed: int = 0) -> dict:
+    """
+    Builds realistic string key sets of (about) the given size, keyed by name.
+    Duplicates are dropped so every set contains distinct keys.
+    """
+    rnd = random.Random(seed)
+    letters = string.ascii_lowercase
+
+    words = (''.join(rnd.choice(letters) for _ in range(rnd.randint(4, 12)))
+             for _ in range(size))
+
+    # product SKUs built from a few character pools, so many keys are anagrams
+    pools = ['AX7Q', 'BR29', 'KM4T', 'ZE81']
+    skus = ('SKU-' + ''.join(rnd.sample(rnd.choice(pools) * 2, 8)) + '-' + str(i % 97)
+            for i in range(size))
+
+    urls = (f"/api/v1/users/{rnd.randrange(10 ** 6)}/orders/{rnd.randrange(10 ** 4)}"
+            for _ in range(size))
+
+    uuids = ('%032x' % rnd.getrandbits(128) for _ in range(size))
+
+    key_sets = {
+        'sequential': ('str' + str(i) for i in range(size)),
+        'words': words,
+        'skus': skus,
+        'urls': urls,
+        'uuids': uuids,
+    }
+    return {name: list(dict.fromkeys(keys)) for name, keys in key_sets.items()}
+
+
+def make_typed_keys(key_type: str, length: int, count: int, seed: int = 0) -> list:
+    """
+    count distinct random keys of a type: str or bytes of length characters or bytes,
+    or int of length digits.
+    """
+    rnd = random.Random(seed)
+    characters = string.ascii_letters + string.digits
+    if key_type == 'int':
+        low = 10 ** (length - 1)
+        draw = lambda: rnd.randrange(low, 10 * low)
+    elif key_type == 'bytes':
+        draw = lambda: rnd.randbytes(length)
+    else:
+        draw = lambda: ''.join(rnd.choices(characters, k=length))
+
+    keys = {}
+    for _ in range(20 * count):
+        keys[draw()] = None
+        if len(keys) == count:
+            return list(keys)
+    raise ValueError(f"{key_type} keys of length {length} are too short for {count} distinct keys")
+
+
+# ------------------------- distributions -------------------------------- #
+
+def chain_lengths(hashes: list, capacity: int) -> list:
+    """Lengths of the non-empty chains a separate chaining table of capacity would hold."""
+    counts = {}
+    for key_hash in hashes:
+        index = key_hash % capacity
+        counts[index] = counts.get(index, 0) + 1
+    return list(counts.values())
+
+
+def probe_lengths(hashes: list, capacity: int) -> list:
+    """
+    Number of slots quadratic probing inspects to place each hash, inserting in order
+    into an open addressing table of capacity.
+    """
+    occupied = bytearray(capacity)
+    lengths = []
+    for key_hash in hashes:
+        index = initial_index = key_hash % capacity
+        probing = 1
+        while occupied[index]:
+            index = (initial_index + probing * probing) % capacity
+            probing += 1
+        occupied[index] = 1
+        lengths.append(probing)
+    return lengths
+
+
+def summarize(lengths: list) -> dict:
+    """Mean, median, 99th percentile and maximum of a list of lengths."""
+    ordered = sorted(lengths)
+    if not ordered:
+        return {'mean': 0.0, 'p50': 0, 'p99': 0, 'max': 0}
+    return {
+        'mean': round(sum(ordered) / len(ordered), 3),
+        'p50': ordered[len(ordered) // 2],
+        'p99': ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)],
+        'max': ordered[-1],
+    }
+
+
+def time_call(function, repeat: int = 3) -> float:
+    """Best wall time of repeat calls of function, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# ------------------------- benchmarks ----------------------------------- #
+
+def bench_hashes(args) -> list:
+    """
+    Throughput of every registered hash function on each key set, plus the chain length
+    distribution of a separate chaining table at load 1.0 and the probe length
+    distribution of an open addressing table at load 0.5.
+    """
+    results = []
+    for set_name, keys in make_key_sets(args.size, args.seed).items():
+        sc_capacity = hash_map_sc.HashMap(len(keys)).get_capacity()
+        oa_capacity = hash_map_oa.HashMap(2 * len(keys), None).get_capacity()
+
+        for function_name, function in HASH_FUNCTIONS.items():
+            if args.functions and function_name not in args.functions:
+                continue
+            seconds = time_call(lambda: [function(key) for key in keys], args.repeat)
+            hashes = [function(key) for key in keys]
+            results.append({
+                'keys': set_name,
+                'function': function_name,
+                'count': len(keys),
+                'distinct_hashes': len(set(hashes)),
+                'mkeys_per_s': round(len(keys) / seconds / 1e6, 3),
+                'chain': summarize(chain_lengths(hashes, sc_capacity)),
+                'probe': summarize(probe_lengths(hashes, oa_capacity)),
+            })
+    return results
+
+
+def print_hashes(results: list) -> None:
+    """Prints bench_hashes results as a table."""
+    print(f"{'keys':<11}{'function':<16}{'Mkeys/s':>9}{'distinct':>10}"
+          f"{'chain mean':>12}{'p99':>5}{'max':>5}{'probe mean':>12}{'p99':>5}{'max':>6}")
+    for row in results:
+        chain, probe = row['chain'], row['probe']
+        print(f"{row['keys']:<11}{row['function']:<16}{row['mkeys_per_s']:>9}"
+              f"{row['distinct_hashes']:>10}{chain['mean']:>12}{chain['p99']:>5}"
+              f"{chain['max']:>5}{probe['mean']:>12}{probe['p99']:>5}{probe['max']:>6}")
+
+
+def python_build() -> str:
+    """Name of the running interpreter build: free-threaded when the GIL is disabled."""
+    if hasattr(sys, '_is_gil_enabled') and not sys._is_gil_enabled():
+        return 'free-threaded'
+    return 'standard'
+
+
+def bench_threads(args) -> list:
+    """
+    Throughput of a ShardedHashMap under threads running a mix of gets and puts, for each
+    shard count and thread count. With one shard every operation contends for one lock.
+    """
+    map_class = hash_map_oa.HashMap if args.map == 'oa' else hash_map_sc.HashMap
+    keys = ['key' + str(i) for i in range(args.size)]
+    build = python_build()
+
+    results = []
+    for shards in args.shards:
+        for thread_count in args.threads:
+
+            # every thread gets its own pre-drawn operations so the timed loop is map calls only
+            plans = []
+            for n in range(thread_count):
+                rnd = random.Random(args.seed * 1000 + n)
+                plans.append([(rnd.random() < args.reads, rnd.choice(keys))
+                              for _ in range(args.ops)])
+
+            def run():
+                m = hash_map_sharded.ShardedHashMap(shards, args.size, 'fnv1a', map_class)
+                for key in keys:
+                    m.put(key, 0)
+
+                def worker(plan):
+                    for read, key in plan:
+                        if read:
+                            m.get(key)
+                        else:
+                            m.put(key, 1)
+
+                threads = [threading.Thread(target=worker, args=(plan,)) for plan in plans]
+                start = time.perf_counter()
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                return time.perf_counter() - start
+
+            seconds = min(run() for _ in range(args.repeat))
+            results.append({
+                'build': build,
+                'map': args.map,
+                'shards': shards,
+                'threads': thread_count,
+                'ops': args.ops * thread_count,
+                'mops_per_s': round(args.ops * thread_count / seconds / 1e6, 3),
+            })
+    return results
+
+
+def print_threads(results: list) -> None:
+    """Prints bench_threads results as a table."""
+    print(f"{'build':<15}{'map':<5}{'shards':>7}{'threads':>9}{'ops':>10}{'Mops/s':>9}")
+    for row in results:
+        print(f"{row['build']:<15}{row['map']:<5}{row['shards']:>7}{row['threads']:>9}"
+              f"{row['ops']:>10}{row['mops_per_s']:>9}")
+
+
+def zipf_stream(size: int, distinct: int, skew: float, seed: int) -> list:
+    """size values drawn from distinct ones with Zipf(skew) frequencies."""
+    rnd = random.Random(seed)
+    weights = [1 / (rank + 1) ** skew for rank in range(distinct)]
+    values = ['value' + str(rank) for rank in range(distinct)]
+    return rnd.choices(values, weights, k=size)
+
+
+def traced_peak(function) -> tuple:
+    """Result of function and the peak memory it allocated, in bytes."""
+    tracemalloc.start()
+    try:
+        result = function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def bench_sketch(args) -> list:
+    """
+    Accuracy and memory of ApproximateModeCounter for each epsilon against the exact
+    ModeCounter behind find_mode, on a Zipf-distributed stream. Recall is the share of
+    the true top values found in the approximate top; error is the mean over-count of
+    their estimates.
+    """
+    stream = zipf_stream(args.size, args.distinct, args.skew, args.seed)
+    exact = hash_map_sc.ModeCounter(function='fnv1a')
+    exact.update(stream)
+    true_top = exact.top_k(args.top)
+    true_values = {true_top[i][0] for i in range(true_top.length())}
+
+    def build(counter_class, *params):
+        counter = counter_class(*params)
+        counter.update(stream)
+        return counter
+
+    results = []
+    configs = [('exact', None)] + [('approx', epsilon) for epsilon in args.epsilons]
+    for method, epsilon in configs:
+        if method == 'exact':
+            params = (hash_map_sc.ModeCounter, 11, 'fnv1a')
+        else:
+            params = (hash_map_sketch.ApproximateModeCounter, epsilon, args.delta)
+        counter, peak = traced_peak(lambda: build(*params))
+        seconds = time_call(lambda: build(*params), args.repeat)
+
+        top = counter.top_k(args.top)
+        found = {top[i][0] for i in range(top.length())}
+        errors = [counter.get_count(value) - exact.get_count(value) for value in true_values]
+        results.append({
+            'method': method,
+            'epsilon': epsilon,
+            'size': args.size,
+            'distinct': exact.get_size(),
+            'memory_kb': round(peak / 1024, 1),
+            'mvalues_per_s': round(args.size / seconds / 1e6, 3),
+            'mode_ok': counter.get_modes()[0] == exact.get_modes()[0],
+            'mode_error': counter.get_mode_frequency() - exact.get_mode_frequency(),
+            'top_recall': round(len(found & true_values) / len(true_values), 3),
+            'top_error': round(sum(errors) / len(errors), 1),
+        })
+    return results
+
+
+def print_sketch(results: list) -> None:
+    """Prints bench_sketch results as a table."""
+    print(f"{'method':<8}{'epsilon':>9}{'memory KB':>11}{'Mvalues/s':>11}{'mode ok':>9}"
+          f"{'mode err':>10}{'recall':>8}{'top err':>9}")
+    for row in results:
+        epsilon = '-' if row['epsilon'] is None else row['epsilon']
+        print(f"{row['method']:<8}{epsilon:>9}{row['memory_kb']:>11}{row['mvalues_per_s']:>11}"
+              f"{str(row['mode_ok']):>9}{row['mode_error']:>10}{row['top_recall']:>8}"
+              f"{row['top_error']:>9}")
+
+
+# map name -> constructor of (capacity, hash function); the dict baseline ignores both
+SUITE_MAPS = {
+    'sc': lambda capacity, function: hash_map_sc.HashMap(capacity, function),
+    'oa': lambda capacity, function: hash_map_oa.HashMap(capacity, function),
+    'dict': lambda capacity, function: {},
+}
+
+
+def map_methods(m) -> tuple:
+    """Bound put, get and remove methods of a HashMap or dict."""
+    if isinstance(m, dict):
+        return m.__setitem__, m.get, m.__delitem__
+    return m.put, m.get, m.remove
+
+
+def suite_capacity(map_name: str, size: int) -> int:
+    """Capacity that holds size keys without growing."""
+    return 2 * size + 1 if map_name == 'oa' else size
+
+
+def suite_workloads(map_name: str, function, keys: list, misses: list, values: list) -> dict:
+    """
+    Workload name -> function that sets up a fresh run and returns the callable to time.
+    Every workload performs len(keys) operations.
+    """
+    size = len(keys)
+    make = SUITE_MAPS[map_name]
+    order = keys[:]
+    random.Random(size).shuffle(order)
+
+    def filled():
+        m = make(suite_capacity(map_name, size), function)
+        put = map_methods(m)[0]
+        for key in keys:
+            put(key, key)
+        return m
+
+    def insert():
+        put = map_methods(make(suite_capacity(map_name, size), function))[0]
+        return lambda: [put(key, key) for key in keys]
+
+    def growth():
+        put = map_methods(make(1, function))[0]
+        return lambda: [put(key, key) for key in keys]
+
+    def lookup_hit():
+        get = map_methods(filled())[1]
+        return lambda: [get(key) for key in order]
+
+    def lookup_miss():
+        get = map_methods(filled())[1]
+        return lambda: [get(key) for key in misses]
+
+    def churn():
+        put, _, remove = map_methods(filled())
+
+        def run():
+            for old, new in zip(order, misses):
+                remove(old)
+                put(new, new)
+        return run
+
+    def iterate():
+        items = filled().items
+        return lambda: [None for _ in items()]
+
+    def find_mode():
+        # separate chaining uses the ModeCounter behind find_mode; others count with get/put
+        if map_name == 'sc':
+            def run():
+                counter = hash_map_sc.ModeCounter(11, function)
+                counter.update(values)
+                return counter.get_modes(), counter.get_mode_frequency()
+            return run
+
+        def run():
+            m = make(1, function)
+            put, get, _ = map_methods(m)
+            for value in values:
+                put(value, (get(value) or 0) + 1)
+            mode_freq = max(count for _, count in m.items())
+            return [value for value, count in m.items() if count == mode_freq], mode_freq
+        return run
+
+    return {
+        'insert': insert,
+        'growth': growth,
+        'lookup_hit': lookup_hit,
+        'lookup_miss': lookup_miss,
+        'churn': churn,
+        'iterate': iterate,
+        'find_mode': find_mode,
+    }
+
+
+def time_workload(prepare, repeat: int = 3) -> float:
+    """Best wall time of repeat runs, each set up fresh by prepare() outside the timing."""
+    best = float('inf')
+    for _ in range(repeat):
+        run = prepare()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def git_commit() -> str:
+    """Short hash of the checked out commit, or None outside a git work tree."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def suite_row_key(row: dict) -> tuple:
+    """Fields identifying a suite result across runs."""
+    return (row['workload'], row['map'], row['function'], row['key_type'],
+            row['key_length'], row['size'])
+
+
+def bench_suite(args) -> list:
+    """
+    Both HashMaps and dict through insert into a presized map, growth from capacity 1,
+    lookups that hit and miss, churn (remove one key and insert another), iteration over
+    items, and find_mode, for every key type, key length, map size and hash function.
+    With --output the results are saved with the commit and interpreter build, and with
+    --compare each row gets its throughput change against a saved run.
+    """
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = {suite_row_key(row): row for row in json.load(file)['results']}
+
+    results = []
+    for key_type in args.key_types:
+        for key_length in args.key_lengths:
+            for size in args.sizes:
+                keys = make_typed_keys(key_type, key_length, 2 * size, args.seed)
+                keys, misses = keys[:size], keys[size:]
+                rnd = random.Random(args.seed)
+                values = [keys[rnd.randrange(max(1, size // 10))] for _ in range(size)]
+
+                for map_name in args.maps:
+                    # dict hashes with hash() whatever function is named
+                    functions = [None] if map_name == 'dict' else args.functions
+                    for function in functions:
+                        try:
+                            if function is not None:
+                                HASH_FUNCTIONS[function](keys[0])
+                        except TypeError:
+                            continue
+
+                        workloads = suite_workloads(map_name, function, keys, misses, values)
+                        for workload in args.workloads:
+                            seconds = time_workload(workloads[workload], args.repeat)
+                            row = {
+                                'workload': workload,
+                                'map': map_name,
+                                'function': function,
+                                'key_type': key_type,
+                                'key_length': key_length,
+                                'size': size,
+                                'mops_per_s': round(size / seconds / 1e6, 4),
+                            }
+                            previous = baseline.get(suite_row_key(row))
+                            if previous is not None:
+                                row['change'] = round(row['mops_per_s'] / previous['mops_per_s'] - 1, 3)
+                            results.append(row)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'commit': git_commit(), 'python': sys.version.split()[0],
+                       'build': python_build(), 'results': results}, file, indent=2)
+    return results
+
+
+def print_suite(results: list) -> None:
+    """Prints bench_suite results as a table, with the change against a baseline if any."""
+    print(f"{'workload':<13}{'map':<6}{'function':<17}{'keys':<6}{'len':>4}{'size':>8}"
+          f"{'Mops/s':>9}{'change':>9}")
+    for row in results:
+        change = f"{row['change']:+.1%}" if 'change' in row else ''
+        print(f"{row['workload']:<13}{row['map']:<6}{row['function'] or '-':<17}"
+              f"{row['key_type']:<6}{row['key_length']:>4}{row['size']:>8}"
+              f"{row['mops_per_s']:>9}{change:>9}")
+
+
+def bench_memory(args) -> list:
+    """
+    Memory each map holds per entry after growing from capacity 1 to size keys, traced
+    with tracemalloc. Keys, which are also the values, are made beforehand and not counted,
+    so bytes per entry is the table plus one node (SC) or entry (OA) per key; the peak also
+    counts the old table and anything else a resize allocates. Entry bytes is the size of
+    a single node or entry object, with its __dict__ if it has one.
+    """
+    keys = make_typed_keys('str', args.key_length, args.size, args.seed)
+
+    def build(map_name, function):
+        m = SUITE_MAPS[map_name](1, function)
+        put = map_methods(m)[0]
+        for key in keys:
+            put(key, key)
+        return m
+
+    results = []
+    for map_name in args.maps:
+        function = None if map_name == 'dict' else args.function
+        tracemalloc.start()
+        try:
+            m = build(map_name, function)
+            retained, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        entry_bytes = None
+        if map_name != 'dict':
+            entry = next(iter(m._entries()))
+            entry_bytes = sys.getsizeof(entry)
+            if hasattr(entry, '__dict__'):
+                entry_bytes += sys.getsizeof(entry.__dict__)
+        results.append({
+            'map': map_name,
+            'function': function,
+            'size': args.size,
+            'bytes_per_entry': round(retained / args.size, 1),
+            'peak_per_entry': round(peak / args.size, 1),
+            'entry_bytes': entry_bytes,
+        })
+        del m
+    return results
+
+
+def print_memory(results: list) -> None:
+    """Prints bench_memory results as a table."""
+    print(f"{'map':<6}{'function':<10}{'size':>9}{'bytes/entry':>13}{'peak/entry':>12}{'entry':>7}")
+    for row in results:
+        print(f"{row['map']:<6}{row['function'] or '-':<10}{row['size']:>9}"
+              f"{row['bytes_per_entry']:>13}{row['peak_per_entry']:>12}{row['entry_bytes'] or '-':>7}")
+
+
+def make_anagram_keys(count: int, groups: int, length: int, seed: int = 0) -> list:
+    """
+    count distinct keys that are permutations of groups base SKUs of length characters,
+    so under hash_function_1 each group shares one full hash.
+    """
+    rnd = random.Random(seed)
+    characters = string.ascii_uppercase + string.digits
+    per_group = -(-count // groups)
+    keys = []
+    for _ in range(groups):
+        base = rnd.sample(characters, length)
+        keys.extend(''.join(p) for p in itertools.islice(itertools.permutations(base), per_group))
+    if len(keys) < count:
+        raise ValueError(f"{groups} SKUs of length {length} have too few permutations for {count} keys")
+    rnd.shuffle(keys)
+    return keys[:count]
+
+
+def bench_anagrams(args) -> list:
+    """
+    Separate chaining on anagram-heavy keys, with chains promoted to NestedChains (the
+    default) and left as linked lists, for each hash function: put, lookups that hit and
+    miss, and the mean and longest number of nodes a lookup visits.
+    """
+    keys = make_anagram_keys(2 * args.size, args.groups, args.key_length, args.seed)
+    keys, misses = keys[:args.size], keys[args.size:]
+
+    results = []
+    for function in args.functions:
+        for chains, map_class in (('nested', hash_map_sc.HashMap),
+                                  ('linked', hash_map_sc.LinkedChainHashMap)):
+            def filled():
+                m = map_class(11, function)
+                for key in keys:
+                    m.put(key, key)
+                return m
+
+            m = filled()
+            seconds = {
+                'put': time_call(filled, args.repeat),
+                'hit': time_call(lambda: [m.get(key) for key in keys], args.repeat),
+                'miss': time_call(lambda: [m.get(key) for key in misses], args.repeat),
+            }
+
+            counted = map_class(11, function, stats=True)
+            for key in keys:
+                counted.put(key, key)
+            for key in keys:
+                counted.get(key)
+            stats = counted.get_stats()
+            results.append({
+                'function': function,
+                'chains': chains,
+                'size': args.size,
+                'groups': args.groups,
+                **{f'{name}_mops_per_s': round(args.size / value / 1e6, 4)
+                   for name, value in seconds.items()},
+                'mean_visited': round(stats['mean_lengths']['get'], 2),
+                'max_visited': stats['max_length'],
+            })
+    return results
+
+
+def print_anagrams(results: list) -> None:
+    """Prints bench_anagrams results as a table."""
+    print(f"{'function':<17}{'chains':<8}{'size':>8}{'put Mops/s':>12}{'hit Mops/s':>12}"
+          f"{'miss Mops/s':>13}{'mean visited':>14}{'max':>7}")
+    for row in results:
+        print(f"{row['function']:<17}{row['chains']:<8}{row['size']:>8}{row['put_mops_per_s']:>12}"
+              f"{row['hit_mops_per_s']:>12}{row['miss_mops_per_s']:>13}{row['mean_visited']:>14}"
+              f"{row['max_visited']:>7}")
+
+
+def bench_flood(args) -> list:
+    """
+    Both HashMaps fed keys an attacker picked to collide (permutations of one SKU, all with
+    the same hash_function_1 hash), with and without flood_guard: time to put them, lookup
+    throughput, the mean and longest number of slots or nodes a lookup visits, and how
+    often the map reseeded. sc_linked is separate chaining without NestedChain promotion,
+    so only flood_guard stands between it and the attack.
+    """
+    keys = make_anagram_keys(args.size, 1, args.key_length, args.seed)
+    map_classes = {'sc': hash_map_sc.HashMap, 'sc_linked': hash_map_sc.LinkedChainHashMap,
+                   'oa': hash_map_oa.HashMap}
+
+    results = []
+    for map_name in args.maps:
+        for flood_guard in (False, True):
+            def filled(stats=False):
+                m = map_classes[map_name](11, args.function, stats=stats, flood_guard=flood_guard)
+                for key in keys:
+                    m.put(key, key)
+                return m
+
+            m = filled()
+            put_seconds = time_call(filled, args.repeat)
+            get_seconds = time_call(lambda: [m.get(key) for key in keys], args.repeat)
+
+            counted = filled(stats=True)
+            for key in keys:
+                counted.get(key)
+            stats = counted.get_stats()
+            results.append({
+                'map': map_name,
+                'flood_guard': flood_guard,
+                'function': args.function,
+                'size': args.size,
+                'put_seconds': round(put_seconds, 4),
+                'get_mops_per_s': round(args.size / get_seconds / 1e6, 4),
+                'mean_visited': round(stats['mean_lengths']['get'], 2),
+                'max_visited': stats['max_length'],
+                'reseeds': counted.get_reseeds(),
+            })
+    return results
+
+
+def print_flood(results: list) -> None:
+    """Prints bench_flood results as a table."""
+    print(f"{'map':<11}{'guard':<7}{'size':>7}{'put s':>10}{'get Mops/s':>12}{'mean visited':>14}"
+          f"{'max':>7}{'reseeds':>9}")
+    for row in results:
+        print(f"{row['map']:<11}{str(row['flood_guard']):<7}{row['size']:>7}{row['put_seconds']:>10}"
+              f"{row['get_mops_per_s']:>12}{row['mean_visited']:>14}{row['max_visited']:>7}"
+              f"{row['reseeds']:>9}")
+
+
+def bench_parallel(args) -> list:
+    """
+    Time of hash_map_parallel.build_parallel() against put() in one process for the same
+    rows, per map and worker count, returning one map and returning a ShardedHashMap.
+    Speedup is sequential time over parallel time; it can't pass the number of CPUs.
+    """
+    rnd = random.Random(args.seed)
+    rows = [('key' + str(rnd.randrange(args.distinct)), i) for i in range(args.size)]
+    map_classes = {'sc': hash_map_sc.HashMap, 'oa': hash_map_oa.HashMap}
+
+    results = []
+    for map_name in args.maps:
+        map_class = map_classes[map_name]
+
+        def sequential():
+            m = map_class(11, args.function)
+            for key, value in rows:
+                m.put(key, value)
+
+        sequential_seconds = time_call(sequential, args.repeat)
+        for workers in args.workers:
+            for sharded in (False, True):
+                seconds = time_call(lambda: hash_map_parallel.build_parallel(
+                    rows, workers, map_class, args.function, sharded=sharded,
+                    chunk_size=args.chunk_size), args.repeat)
+                results.append({
+                    'map': map_name,
+                    'sharded': sharded,
+                    'workers': workers,
+                    'cpus': os.cpu_count(),
+                    'size': args.size,
+                    'sequential_seconds': round(sequential_seconds, 3),
+                    'parallel_seconds': round(seconds, 3),
+                    'speedup': round(sequential_seconds / seconds, 2),
+                })
+    return results
+
+
+def print_parallel(results: list) -> None:
+    """Prints bench_parallel results as a table."""
+    print(f"{'map':<5}{'sharded':<9}{'workers':>8}{'cpus':>6}{'size':>9}{'sequential s':>14}"
+          f"{'parallel s':>12}{'speedup':>9}")
+    for row in results:
+        print(f"{row['map']:<5}{str(row['sharded']):<9}{row['workers']:>8}{row['cpus']:>6}"
+              f"{row['size']:>9}{row['sequential_seconds']:>14}{row['parallel_seconds']:>12}"
+              f"{row['speedup']:>9}")
+
+
+BENCHMARKS = {
+    'hashes': (bench_hashes, print_hashes),
+    'threads': (bench_threads, print_threads),
+    'sketch': (bench_sketch, print_sketch),
+    'suite': (bench_suite, print_suite),
+    'memory': (bench_memory, print_memory),
+    'anagrams': (bench_anagrams, print_anagrams),
+    'flood': (bench_flood, print_flood),
+    'parallel': (bench_parallel, print_parallel),
+}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='HashMap benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    hashes = subparsers.add_parser('hashes', help='hash function throughput and quality')
+    hashes.add_argument('--size', type=int, default=20000, help='keys per key set')
+    hashes.add_argument('--functions', nargs='*', help='registered names to run (default all)')
+
+    threads = subparsers.add_parser('threads', help='sharded map throughput vs. shards and threads')
+    threads.add_argument('--size', type=int, default=20000, help='distinct keys in the map')
+    threads.add_argument('--ops', type=int, default=50000, help='operations per thread')
+    threads.add_argument('--reads', type=float, default=0.9, help='fraction of operations that are gets')
+    threads.add_argument('--threads', type=int, nargs='*', default=[1, 2, 4, 8], help='thread counts')
+    threads.add_argument('--shards', type=int, nargs='*', default=[1, 4, 16], help='shard counts')
+    threads.add_argument('--map', choices=['sc', 'oa'], default='sc', help='shard HashMap class')
+
+    sketch = subparsers.add_parser('sketch', help='approximate vs. exact mode accuracy and memory')
+    sketch.add_argument('--size', type=int, default=100000, help='values in the stream')
+    sketch.add_argument('--distinct', type=int, default=50000, help='distinct values to draw from')
+    sketch.add_argument('--skew', type=float, default=1.1, help='Zipf exponent of the stream')
+    sketch.add_argument('--epsilons', type=float, nargs='*', default=[0.01, 0.001], help='sketch error bounds')
+    sketch.add_argument('--delta', type=float, default=0.01, help='sketch failure probability')
+    sketch.add_argument('--top', type=int, default=10, help='number of top values to compare')
+
+    suite = subparsers.add_parser('suite', help='SC vs. OA vs. dict on standard workloads')
+    suite.add_argument('--maps', nargs='*', choices=list(SUITE_MAPS), default=list(SUITE_MAPS),
+                       help='maps to run')
+    suite.add_argument('--workloads', nargs='*', default=['insert', 'growth', 'lookup_hit', 'lookup_miss',
+                                                          'churn', 'iterate', 'find_mode'],
+                       help='workloads to run')
+    suite.add_argument('--key-types', nargs='*', choices=['str', 'bytes', 'int'], default=['str', 'int'],
+                       help='key types')
+    suite.add_argument('--key-lengths', type=int, nargs='*', default=[8, 32],
+                       help='characters, bytes or digits per key')
+    suite.add_argument('--sizes', type=int, nargs='*', default=[1000, 10000], help='keys per map')
+    suite.add_argument('--functions', nargs='*', default=['fnv1a', 'builtin'],
+                       help='registered hash functions for the HashMaps')
+    suite.add_argument('--output', help='save results with the commit and build to this JSON file')
+    suite.add_argument('--compare', help='JSON file saved by --output to compare against')
+
+    memory = subparsers.add_parser('memory', help='bytes per entry of SC, OA and dict')
+    memory.add_argument('--size', type=int, default=1000000, help='keys in the map')
+    memory.add_argument('--maps', nargs='*', choices=list(SUITE_MAPS), default=list(SUITE_MAPS),
+                        help='maps to run')
+    memory.add_argument('--function', default='builtin', help='registered hash function for the HashMaps')
+    memory.add_argument('--key-length', type=int, default=8, help='characters per key')
+
+    anagrams = subparsers.add_parser('anagrams', help='SC lookups on keys that are permutations of a few SKUs')
+    anagrams.add_argument('--size', type=int, default=20000, help='keys in the map')
+    anagrams.add_argument('--groups', type=int, default=4, help='base SKUs the keys permute')
+    anagrams.add_argument('--key-length', type=int, default=8, help='characters per SKU')
+    anagrams.add_argument('--functions', nargs='*', default=['hash_function_1', 'fnv1a'],
+                          help='registered hash functions')
+
+    flood = subparsers.add_parser('flood', help='colliding keys with and without flood_guard')
+    flood.add_argument('--size', type=int, default=5000, help='colliding keys to put')
+    flood.add_argument('--maps', nargs='*', choices=['sc', 'sc_linked', 'oa'],
+                       default=['sc', 'sc_linked', 'oa'], help='maps to run')
+    flood.add_argument('--function', default='hash_function_1', help='registered hash function the attack targets')
+    flood.add_argument('--key-length', type=int, default=8, help='characters of the permuted SKU')
+
+    parallel = subparsers.add_parser('parallel', help='build_parallel speedup over sequential put')
+    parallel.add_argument('--size', type=int, default=300000, help='rows to build from')
+    parallel.add_argument('--distinct', type=int, default=200000, help='distinct keys to draw from')
+    parallel.add_argument('--workers', type=int, nargs='*', default=[1, 2, 4], help='worker process counts')
+    parallel.add_argument('--maps', nargs='*', choices=['sc', 'oa'], default=['sc', 'oa'], help='maps to run')
+    parallel.add_argument('--function', default='fnv1a', help='deterministic registered hash function')
+    parallel.add_argument('--chunk-size', type=int, default=100000, help='rows sent to a worker at a time')
+
+    for subparser in subparsers.choices.values():
+        subparser.add_argument('--seed', type=int, default=0, help='random seed for key sets')
+        subparser.add_argument('--repeat', type=int, default=3, help='timing repetitions')
+        subparser.add_argument('--json', action='store_true', help='print results as JSON')
+
+    args = parser.parse_args(argv)
+    run, show = BENCHMARKS[args.benchmark]
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        show(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,505 @@
+# Name: Aubrey Floyd
+# Course: CS261 - Data Structures
+# Description: Implementation of a BoundedCache built on the separate chaining or open addressing
+#              HashMap. The map stores one CacheNode per key, and the eviction policy threads its
+#              ordering through those same nodes (an intrusive doubly linked list for LRU and TTL,
+#              frequency buckets for LFU), so get, put and eviction stay O(1) and a get hashes
+#              its key only once. The cache is bounded by an entry count, a byte budget, or both.
+#              Class includes methods: get, put, remove, contains_key, clear, get_size, get_bytes,
+#              and get_stats.
+
+import sys
+import time
+
+from a6_include import DynamicArray, hash_function_1
+import hash_map_oa
+import hash_map_sc
+
+
+class CacheNode:
+    """
+    Cache entry stored as the value of the underlying HashMap. prev and next link it
+    into its policy's list; bucket is the LFU frequency bucket holding it.
+    """
+
+    # slots instead of a per-node __dict__: a cache holds one node per entry
+    __slots__ = ('key', 'value', 'size', 'expires', 'prev', 'next', 'bucket')
+
+    def __init__(self, key: object, value: object, size: int, expires: float) -> None:
+        """Initialize node given a key, value, size in bytes and expiry time."""
+        self.key = key
+        self.value = value
+        self.size = size
+        self.expires = expires
+        self.prev = None
+        self.next = None
+        self.bucket = None
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return '(' + str(self.key) + ': ' + str(self.value) + ')'
+
+
+class NodeList:
+    """
+    Circular doubly linked list of CacheNodes around a sentinel; the front holds the
+    oldest node. Supported methods are: push_back, unlink, move_to_back, front, is_empty
+    """
+
+    def __init__(self) -> None:
+        """Initialize new empty list."""
+        self._sentinel = CacheNode(None, None, 0, None)
+        self._sentinel.prev = self._sentinel
+        self._sentinel.next = self._sentinel
+
+    def push_back(self, node: CacheNode) -> None:
+        """Link node in as the newest node."""
+        last = self._sentinel.prev
+        node.prev = last
+        node.next = self._sentinel
+        last.next = node
+        self._sentinel.prev = node
+
+    @staticmethod
+    def unlink(node: CacheNode) -> None:
+        """Unlink node from whichever list holds it."""
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        node.prev = node.next = None
+
+    def move_to_back(self, node: CacheNode) -> None:
+        """Make node, already in this list, the newest node."""
+        self.unlink(node)
+        self.push_back(node)
+
+    def front(self) -> CacheNode:
+        """Return the oldest node, or None if the list is empty."""
+        node = self._sentinel.next
+        return None if node is self._sentinel else node
+
+    def is_empty(self) -> bool:
+        """Return True if the list holds no nodes."""
+        return self._sentinel.next is self._sentinel
+
+
+class LRUPolicy:
+    """
+    Evicts the least recently used entry. Gets and overwrites move a node to the back.
+    """
+
+    def __init__(self) -> None:
+        """Initialize policy with an empty recency list."""
+        self._nodes = NodeList()
+
+    def insert(self, node: CacheNode) -> None:
+        """Track a new node."""
+        self._nodes.push_back(node)
+
+    def access(self, node: CacheNode) -> None:
+        """Record a get of node."""
+        self._nodes.move_to_back(node)
+
+    def update(self, node: CacheNode) -> None:
+        """Record an overwrite of node."""
+        self._nodes.move_to_back(node)
+
+    def remove(self, node: CacheNode) -> None:
+        """Stop tracking node."""
+        self._nodes.unlink(node)
+
+    def clear(self) -> None:
+        """Stop tracking every node."""
+        self._nodes = NodeList()
+
+    def victim(self) -> CacheNode:
+        """Return the node to evict next, or None if nothing is tracked."""
+        return self._nodes.front()
+
+
+class TTLPolicy(LRUPolicy):
+    """
+    Evicts the entry closest to expiring. With one ttl for the whole cache that is the
+    least recently written entry, so gets leave the order alone.
+    """
+
+    def access(self, node: CacheNode) -> None:
+        """Record a get of node; reads don't extend an entry's life."""
+        pass
+
+
+class FrequencyBucket:
+    """
+    LFU bucket holding every node used freq times, least recently used first
+    """
+
+    def __init__(self, freq: int) -> None:
+        """Initialize empty bucket for a use count."""
+        self.freq = freq
+        self.nodes = NodeList()
+        self.prev = None
+        self.next = None
+
+
+class LFUPolicy:
+    """
+    Evicts the least frequently used entry, and the least recently used among ties.
+    Buckets form a doubly linked list in increasing frequency, so a use moves a node to
+    the next bucket, creating it if needed, in O(1).
+    """
+
+    def __init__(self) -> None:
+        """Initialize policy with no frequency buckets."""
+        self._head = FrequencyBucket(0)
+        self._head.prev = self._head
+        self._head.next = self._head
+
+    def insert(self, node: CacheNode) -> None:
+        """Track a new node, used once."""
+        bucket = self._bucket_after(self._head, 1)
+        bucket.nodes.push_back(node)
+        node.bucket = bucket
+
+    def access(self, node: CacheNode) -> None:
+        """Record a get of node."""
+        bucket = node.bucket
+        next_bucket = self._bucket_after(bucket, bucket.freq + 1)
+        bucket.nodes.unlink(node)
+        next_bucket.nodes.push_back(node)
+        node.bucket = next_bucket
+        self._drop_if_empty(bucket)
+
+    def update(self, node: CacheNode) -> None:
+        """Record an overwrite of node."""
+        self.access(node)
+
+    def remove(self, node: CacheNode) -> None:
+        """Stop tracking node."""
+        bucket = node.bucket
+        bucket.nodes.unlink(node)
+        node.bucket = None
+        self._drop_if_empty(bucket)
+
+    def clear(self) -> None:
+        """Stop tracking every node, dropping all frequency buckets."""
+        self._head.prev = self._head
+        self._head.next = self._head
+
+    def victim(self) -> CacheNode:
+        """Return the node to evict next, or None if nothing is tracked."""
+        return self._head.next.nodes.front()
+
+    def _bucket_after(self, bucket: FrequencyBucket, freq: int) -> FrequencyBucket:
+        """Return the bucket for freq that follows bucket, linking in a new one if needed."""
+        if bucket.next.freq == freq:
+            return bucket.next
+
+        new_bucket = FrequencyBucket(freq)
+        new_bucket.prev = bucket
+        new_bucket.next = bucket.next
+        bucket.next.prev = new_bucket
+        bucket.next = new_bucket
+        return new_bucket
+
+    def _drop_if_empty(self, bucket: FrequencyBucket) -> None:
+        """Unlink bucket once no node uses its frequency."""
+        if bucket.nodes.is_empty():
+            bucket.prev.next = bucket.next
+            bucket.next.prev = bucket.prev
+
+
+# name -> policy class, for the policy argument of BoundedCache
+EVICTION_POLICIES = {
+    'lru': LRUPolicy,
+    'lfu': LFUPolicy,
+    'ttl': TTLPolicy,
+}
+
+
+def entry_size(key: object, value: object) -> int:
+    """
+    Default size of a cache entry in bytes: the shallow size of its key and value.
+    """
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class BoundedCache:
+    def __init__(self,
+                 max_entries: int = None,
+                 max_bytes: int = None,
+                 policy='lru',
+                 ttl: float = None,
+                 map_class: type = hash_map_sc.HashMap,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 sizeof: callable = entry_size,
+                 clock: callable = time.monotonic,
+                 **options) -> None:
+        """
+        Initialize new BoundedCache holding at most max_entries entries and max_bytes bytes,
+        as measured by sizeof(key, value); None leaves that limit off
+        policy is 'lru', 'lfu', 'ttl', or an object with the methods of LRUPolicy
+        entries expire ttl seconds of clock() after they were last put, if ttl is given
+        map_class, capacity, function and options build the underlying HashMap
+        """
+        if max_entries is None and max_bytes is None:
+            raise ValueError("max_entries or max_bytes must be given")
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if policy == 'ttl' and ttl is None:
+            raise ValueError("the ttl policy needs a ttl")
+
+        self._map = map_class(capacity, function, **options)
+        self._policy = EVICTION_POLICIES[policy]() if isinstance(policy, str) else policy
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        return str(self._map)
+
+    def get_size(self) -> int:
+        """
+        Return number of cached entries, including expired ones not yet removed
+        """
+        return self._map.get_size()
+
+    def get_bytes(self) -> int:
+        """
+        Return total size of cached entries in bytes
+        """
+        return self._bytes
+
+    def get_stats(self) -> dict:
+        """
+        Return hit, miss, eviction and expiration counts and the current size
+        """
+        lookups = self._hits + self._misses
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': self._hits / lookups if lookups else 0.0,
+            'evictions': self._evictions,
+            'expirations': self._expirations,
+            'size': self._map.get_size(),
+            'bytes': self._bytes,
+        }
+
+    # ------------------------------------------------------------------ #
+
+    def get(self, key: object) -> object:
+        """
+        Gets value cached for key, or None if key isn't cached or has expired. Finds the
+        node with a single HashMap lookup, then updates the policy through the node.
+        O(1) average time complexity.
+        :param key: key to get value from
+        :return: value at key
+        """
+
+        node = self._map.get(key)
+        if node is not None and self._ttl is not None and node.expires <= self._clock():
+            self._discard(node)
+            self._expirations += 1
+            node = None
+
+        if node is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._policy.access(node)
+        return node.value
+
+
+    def put(self, key: object, value: object) -> None:
+        """
+        Caches value for key, first evicting entries until it fits within the cache's
+        limits. Raises ValueError if the entry alone is larger than max_bytes.
+        O(1) average time complexity.
+        :param key: key to be added
+        :param value: value to be added
+        :return: none
+        """
+
+        size = self._sizeof(key, value) if self._max_bytes is not None else 0
+        if self._max_bytes is not None and size > self._max_bytes:
+            raise ValueError("entry is larger than max_bytes")
+
+        now = self._clock()
+        expires = now + self._ttl if self._ttl is not None else None
+        self._expire(now)
+
+        # make room before placing the entry, so it is never its own victim
+        node = self._map.get(key)
+        while self._over_limit(node is None, size - node.size if node is not None else size):
+            victim = self._policy.victim()
+            self._discard(victim)
+            self._evictions += 1
+            if victim is node:
+                node = None
+
+        # overwrite in place so the key keeps its node and map entry
+        if node is not None:
+            self._bytes += size - node.size
+            node.value = value
+            node.size = size
+            node.expires = expires
+            self._policy.update(node)
+        else:
+            node = CacheNode(key, value, size, expires)
+            self._map.put(key, node)
+            self._policy.insert(node)
+            self._bytes += size
+
+
+    def remove(self, key: object) -> None:
+        """
+        Removes given key and value from the cache. O(1) average time complexity.
+        :param key: key for key/value pair to be removed
+        :return: none
+        """
+
+        node = self._map.get(key)
+        if node is not None:
+            self._discard(node)
+
+
+    def contains_key(self, key: object) -> bool:
+        """
+        Checks if an unexpired value is cached for key, without counting a hit or miss
+        or changing its place in the eviction order.
+        :param key: key to check for in cache
+        :return: bool value, True if exists otherwise False
+        """
+
+        node = self._map.get(key)
+        if node is None:
+            return False
+        return self._ttl is None or node.expires > self._clock()
+
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the cache, keeping its counters.
+        :return: none
+        """
+
+        self._map.clear()
+        self._policy.clear()
+        self._bytes = 0
+
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a dynamic array of cached key/value tuples, in map order.
+        :return: Dynamic Array with tuples
+        """
+
+        keys_values = DynamicArray()
+        for key, node in self._map.items():
+            keys_values.append((key, node.value))
+        return keys_values
+
+    # ------------------------------------------------------------------ #
+
+    def _over_limit(self, new_entries: int, new_bytes: int) -> bool:
+        """
+        Checks if adding entries and bytes would put the cache over its limits.
+        :param new_entries: number of entries to be added
+        :param new_bytes: number of bytes to be added
+        :return: True if an entry must be evicted first
+        """
+
+        return ((self._max_entries is not None
+                 and self._map.get_size() + new_entries > self._max_entries)
+                or (self._max_bytes is not None
+                    and self._bytes + new_bytes > self._max_bytes))
+
+
+    def _expire(self, now: float) -> None:
+        """
+        Removes expired entries from the front of the eviction order. Stops at the first
+        live victim, so each put does O(1) amortized work; with the lru or lfu policy
+        expired entries further back are removed when they are reached or read.
+        :param now: current clock() time
+        :return: none
+        """
+
+        if self._ttl is None:
+            return
+        node = self._policy.victim()
+        while node is not None and node.expires <= now:
+            self._discard(node)
+            self._expirations += 1
+            node = self._policy.victim()
+
+
+    def _discard(self, node: CacheNode) -> None:
+        """
+        Removes a node from the policy and the map.
+        :param node: node to remove
+        :return: none
+        """
+
+        self._policy.remove(node)
+        self._map.remove(node.key)
+        self._bytes -= node.size
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nLRU example 1")
+    print("-------------")
+    c = BoundedCache(max_entries=3)
+    for key in ('a', 'b', 'c'):
+        c.put(key, key.upper())
+    c.get('a')
+    c.put('d', 'D')
+    print(c.contains_key('a'), c.contains_key('b'), c.get_size(), c.get('z'))
+    print(c.get_stats())
+
+    print("\nLFU example 1")
+    print("-------------")
+    c = BoundedCache(max_entries=3, policy='lfu', map_class=hash_map_oa.HashMap)
+    for key in ('a', 'b', 'c'):
+        c.put(key, 0)
+    for _ in range(3):
+        c.get('a')
+    c.get('c')
+    c.put('d', 0)
+    c.put('e', 0)
+    print(c.contains_key('a'), c.contains_key('b'), c.contains_key('c'),
+          c.contains_key('d'), c.contains_key('e'))
+
+    print("\nTTL example 1")
+    print("-------------")
+    now = [0.0]
+    c = BoundedCache(max_entries=100, policy='ttl', ttl=10, clock=lambda: now[0])
+    c.put('a', 1)
+    now[0] = 5
+    c.put('b', 2)
+    print(c.get('a'), c.get('b'))
+    now[0] = 12
+    print(c.get('a'), c.get('b'))
+    c.put('c', 3)
+    now[0] = 16
+    c.put('d', 4)
+    print(c.get_size(), c.get_stats()['expirations'])
+
+    print("\nbyte budget example 1")
+    print("---------------------")
+    c = BoundedCache(max_bytes=1000, function='fnv1a', sizeof=lambda key, value: len(value))
+    for i in range(10):
+        c.put(i, 'x' * 300)
+    print(c.get_size(), c.get_bytes(), c.get_stats()['evictions'], c.get(9) is not None)
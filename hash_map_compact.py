@@ -0,0 +1,714 @@
+# Name: Aubrey Floyd
+# Course: CS261 - Data Structures
+# Description: Implementation of an open addressing HashMap with quadratic probing that stores its
+#              hash table as parallel arrays of hashes, keys and values plus a byte array of slot
+#              states, instead of one HashEntry object per slot. Same public methods as the
+#              hash_map_oa HashMap: put, get, remove, contains_key, clear, empty_buckets,
+#              resize_table, table_load, get_keys_and_values, __iter__, keys, values, items, plus dump
+#              and load.
+
+import copyreg
+import pickle
+from array import array
+
+from a6_include import (DynamicArray, HashEntry, HashMapIterator, ItemsView, KeysView,
+                        ValuesView, dump_map, get_hash_function, hash_function_1,
+                        hash_function_2, load_map)
+
+
+# slot states kept in the byte array
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+# hashes are stored as unsigned 64-bit values
+_HASH_MASK = (1 << 64) - 1
+
+
+class HashMap:
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses quadratic probing for collision
+        resolution and keeps hashes, keys, values and slot states in
+        parallel arrays
+        function may be a hash function or the name of one registered in
+        a6_include.HASH_FUNCTIONS
+        """
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = get_hash_function(function)
+        self._size = 0
+        self._tombstones = 0
+
+        # structural modifications, checked by iterators
+        self._mod_count = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide the same output as the
+        hash_map_oa HashMap
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == EMPTY:
+                slot = 'None'
+            else:
+                slot = f"K: {self._keys[i]} V: {self._values[i]} TS: {self._states[i] == TOMBSTONE}"
+            out += str(i) + ': ' + slot + '\n'
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get_tombstones(self) -> int:
+        """
+        Return number of tombstones in the hash table
+        """
+        return self._tombstones
+
+    def __reduce_ex__(self, protocol: int) -> tuple:
+        """
+        Pickle the parallel arrays as they are. Under protocol 5 the slot state and
+        hash arrays are wrapped in PickleBuffers so they can be sent out-of-band
+        """
+        states, hashes = self._states, self._hashes
+        if protocol >= 5:
+            states, hashes = pickle.PickleBuffer(states), pickle.PickleBuffer(hashes)
+        state = {
+            'capacity': self._capacity,
+            'function': self._hash_function,
+            'size': self._size,
+            'tombstones': self._tombstones,
+            'states': states,
+            'hashes': hashes,
+            'keys': self._keys,
+            'values': self._values,
+        }
+        return copyreg.__newobj__, (type(self),), state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore pickled arrays. If the hash function still gives the stored hash of
+        a key they are used as the table directly; otherwise (a seeded hash function
+        in another process) every live key is rehashed and put
+        """
+        self.__init__(state['capacity'], state['function'])
+        states = bytearray(state['states'])
+        hashes = state['hashes']
+        if not isinstance(hashes, array):
+            hashes = array('Q')
+            hashes.frombytes(memoryview(state['hashes']).cast('B'))
+        keys, values = state['keys'], state['values']
+
+        index = states.find(LIVE)
+        if index != -1 and self._hash_function(keys[index]) & _HASH_MASK != hashes[index]:
+            for i in range(len(states)):
+                if states[i] == LIVE:
+                    self.put(keys[i], values[i])
+            return
+
+        self._states, self._hashes = states, hashes
+        self._keys, self._values = keys, values
+        self._size, self._tombstones = state['size'], state['tombstones']
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates key/value pair in hash map. Resizes table if needed. O(1) average time complexity.
+        An existing key has its value overwritten in place, nothing is allocated.
+        :param key: key to be added
+        :param value: value to be added
+        :return: none
+        """
+
+        # tombstones lengthen probe sequences like live entries, so both count toward the
+        # 0.5 limit; resize double if needed, or rebuild at the same capacity when
+        # tombstones outnumber live entries
+        if (self._size + self._tombstones) / self._capacity >= 0.5:
+            if self._tombstones > self._size:
+                self.resize_table(self._capacity)
+            else:
+                self.resize_table(self._capacity * 2)
+
+        # find index for key/value pair to be put, index = hash % array_size
+        key_hash = self._hash_function(key) & _HASH_MASK
+        index = key_hash % self._capacity
+
+        # initialize for quadratic probing, i = initial + p^2
+        initial_index = index
+        probing = 1
+
+        # if key exists replace value, else probe to find open slot or tombstone
+        # probing continues past tombstones so an existing key is never stored twice
+        states, hashes, keys = self._states, self._hashes, self._keys
+        tombstone_index = None
+        while states[index] != EMPTY:
+            if states[index] == TOMBSTONE:
+                if tombstone_index is None:
+                    tombstone_index = index
+            elif hashes[index] == key_hash and keys[index] == key:
+                self._values[index] = value
+                return
+            index = (initial_index + probing * probing) % self._capacity
+            probing += 1
+
+        # no existing key, put new key value pair in first tombstone or open slot
+        if tombstone_index is not None:
+            index = tombstone_index
+            self._tombstones -= 1
+        self._store(index, key_hash, key, value)
+        self._size += 1
+        self._mod_count += 1
+
+
+    def table_load(self) -> float:
+        """
+        Finds current hash table load factor. O(1) average time complexity.
+        No parameters.
+        :return: float value of load factor
+        """
+
+        # load factor = # of elements in table / # of buckets
+        return self._size / self._capacity
+
+
+    def empty_buckets(self) -> int:
+        """
+        Finds number of empty buckets in hash table.
+        No parameters.
+        :return: integer values of number of empty buckets
+        """
+
+        # every slot not holding a live entry or a tombstone is empty
+        return self._capacity - self._size - self._tombstones
+
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes capacity of internal hash table while maintaining key/value pairs in hash map.
+        Entries are placed from their stored hashes, keys are never rehashed.
+        :param new_capacity: new capacity size of hash table
+        :return: none
+        """
+
+        # check if new capacity is less than current number of elements
+        if new_capacity <= self._size:
+            return
+
+        # make sure new capacity is prime and load factor is less than 0.5
+        while not (self._is_prime(new_capacity) and (self._size / new_capacity <= 0.5)):
+            if not self._is_prime(new_capacity):
+                new_capacity = self._next_prime(new_capacity)
+            if not self._size / new_capacity <= 0.5:
+                new_capacity *= 2
+
+        old_states, old_hashes = self._states, self._hashes
+        old_keys, old_values = self._keys, self._values
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        self._tombstones = 0
+
+        # move every live slot to the first open slot of its new probe sequence
+        states = self._states
+        for i in range(len(old_states)):
+            if old_states[i] == LIVE:
+                index = old_hashes[i] % new_capacity
+                initial_index = index
+                probing = 1
+
+                while states[index] != EMPTY:
+                    index = (initial_index + probing * probing) % new_capacity
+                    probing += 1
+
+                self._store(index, old_hashes[i], old_keys[i], old_values[i])
+        self._mod_count += 1
+
+
+    def get(self, key: str) -> object:
+        """
+        Gets value associated with given key, or None if key doesn't exist.
+        O(1) average time complexity.
+        :param key: key to get value from
+        :return: value at key
+        """
+
+        index = self._find(key)
+        if index is not None:
+            return self._values[index]
+
+        # if key not in hash map, returns None
+        return None
+
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if given key is in hash map. O(1) average time complexity.
+        :param key: key to check for in hash map
+        :return: bool value, True if exists otherwise False
+        """
+
+        # if key not in hash map, returns False
+        return self._find(key) is not None
+
+
+    def remove(self, key: str) -> None:
+        """
+        Removes given key and value from hash map. O(1) average time complexity.
+        :param key: key for key/value pair to be removed
+        :return: none
+        """
+
+        # find slot and mark it as a tombstone
+        index = self._find(key)
+        if index is not None:
+            self._states[index] = TOMBSTONE
+            self._size -= 1
+            self._tombstones += 1
+            self._mod_count += 1
+
+
+    def clear(self) -> None:
+        """
+        Clears contents of the hash map without changing underlying hash table capacity.
+        No parameters.
+        :return: none
+        """
+
+        # clear slots and size
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+        self._mod_count += 1
+
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a dynamic array where each index contains a tuple key/value pair stores in the
+        hasp map.
+        No parameters.
+        :return: Dynamic Array with tuples
+        """
+
+        # initialize dynamic array, order of the keys does not matter
+        keys_values = DynamicArray()
+
+        # add each key/value tuple to array
+        states, keys, values = self._states, self._keys, self._values
+        for i in range(self._capacity):
+            if states[i] == LIVE:
+                keys_values.append((keys[i], values[i]))
+        return keys_values
+
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Creates an independent iterator across the hash map's entries. Each call returns a new
+        iterator, so loops can be nested, and it raises RuntimeError if the map is modified
+        during iteration.
+        :return: iterator of HashEntry objects
+        """
+
+        return HashMapIterator(self, self._entries())
+
+
+    def keys(self) -> KeysView:
+        """
+        Creates a lazy view of the keys that walks the buckets without copying them.
+        :return: KeysView of the hash map
+        """
+
+        return KeysView(self)
+
+
+    def values(self) -> ValuesView:
+        """
+        Creates a lazy view of the values that walks the buckets without copying them.
+        :return: ValuesView of the hash map
+        """
+
+        return ValuesView(self)
+
+
+    def items(self) -> ItemsView:
+        """
+        Creates a lazy view of the (key, value) pairs that walks the buckets without copying them.
+        :return: ItemsView of the hash map
+        """
+
+        return ItemsView(self)
+
+
+    def dump(self, file) -> None:
+        """
+        Writes the hash map to a binary file object as a pickle protocol 5 stream followed by
+        the slot state and hash arrays as raw bytes, see a6_include.dump_map().
+        :param file: file object opened for binary writing
+        :return: none
+        """
+
+        dump_map(self, file)
+
+
+    @classmethod
+    def load(cls, file) -> "HashMap":
+        """
+        Reads a hash map written by dump().
+        :param file: file object opened for binary reading
+        :return: loaded hash map
+        """
+
+        hash_map = load_map(file)
+        if not isinstance(hash_map, cls):
+            raise ValueError(f"dump holds a {type(hash_map).__name__}, not a {cls.__name__}")
+        return hash_map
+
+    # ------------------------------------------------------------------ #
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replaces the parallel arrays with empty ones of the given capacity.
+        :param capacity: number of slots
+        :return: none
+        """
+
+        self._states = bytearray(capacity)
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+
+    def _store(self, index: int, key_hash: int, key: str, value: object) -> None:
+        """
+        Writes a live entry into a slot.
+        :param index: slot to write
+        :param key_hash: masked full hash of key
+        :param key: key to store
+        :param value: value to store
+        :return: none
+        """
+
+        self._states[index] = LIVE
+        self._hashes[index] = key_hash
+        self._keys[index] = key
+        self._values[index] = value
+
+
+    def _entries(self):
+        """
+        Starts a walk over the live slots. Entries are built on demand since the table holds
+        no HashEntry objects.
+        :return: generator of HashEntry objects
+        """
+
+        states, hashes, keys, values = self._states, self._hashes, self._keys, self._values
+        return (HashEntry(keys[i], values[i], hashes[i])
+                for i in range(len(states)) if states[i] == LIVE)
+
+
+    def _find(self, key: str):
+        """
+        Probes for the live slot holding key.
+        :param key: key to look for
+        :return: slot index, or None if key isn't in the hash map
+        """
+
+        # find index and set up for probing
+        key_hash = self._hash_function(key) & _HASH_MASK
+        index = key_hash % self._capacity
+        initial_index = index
+        probing = 1
+
+        # quadratic probing reaches only (capacity + 1) / 2 slots, which a small table just
+        # under load 0.5 can fill; the sequence repeats after capacity probes
+        states, hashes, keys = self._states, self._hashes, self._keys
+        while probing <= self._capacity and states[index] != EMPTY:
+            if states[index] == LIVE and hashes[index] == key_hash and keys[index] == key:
+                return index
+            index = (initial_index + probing * probing) % self._capacity
+            probing += 1
+        return None
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = HashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - table_load example 1")
+    print("--------------------------")
+    m = HashMap(101, hash_function_1)
+    print(round(m.table_load(), 2))
+    m.put('key1', 10)
+    print(round(m.table_load(), 2))
+    m.put('key2', 20)
+    print(round(m.table_load(), 2))
+    m.put('key1', 30)
+    print(round(m.table_load(), 2))
+
+    print("\nPDF - table_load example 2")
+    print("--------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(50):
+        m.put('key' + str(i), i * 100)
+        if i % 10 == 0:
+            print(round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - empty_buckets example 1")
+    print("-----------------------------")
+    m = HashMap(101, hash_function_1)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 30)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key4', 40)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nPDF - empty_buckets example 2")
+    print("-----------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('key' + str(i), i * 100)
+        if i % 30 == 0:
+            print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nPDF - resize example 1")
+    print("----------------------")
+    m = HashMap(20, hash_function_1)
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity(), m.get('key1'), m.contains_key('key1'))
+    m.resize_table(30)
+    print(m.get_size(), m.get_capacity(), m.get('key1'), m.contains_key('key1'))
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = HashMap(75, hash_function_2)
+    keys = [i for i in range(25, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        if m.table_load() > 0.5:
+            print(f"Check that the load factor is acceptable after the call to resize_table().\n"
+                  f"Your load factor is {round(m.table_load(), 2)} and should be less than or equal to 0.5")
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nPDF - get example 1")
+    print("-------------------")
+    m = HashMap(31, hash_function_1)
+    print(m.get('key'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+
+    print("\nPDF - get example 2")
+    print("-------------------")
+    m = HashMap(151, hash_function_2)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    print(m.get_size(), m.get_capacity())
+    for i in range(200, 300, 21):
+        print(i, m.get(str(i)), m.get(str(i)) == i * 10)
+        print(i + 1, m.get(str(i + 1)), m.get(str(i + 1)) == (i + 1) * 10)
+
+    print("\nPDF - contains_key example 1")
+    print("----------------------------")
+    m = HashMap(11, hash_function_1)
+    print(m.contains_key('key1'))
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key3', 30)
+    print(m.contains_key('key1'))
+    print(m.contains_key('key4'))
+    print(m.contains_key('key2'))
+    print(m.contains_key('key3'))
+    m.remove('key3')
+    print(m.contains_key('key3'))
+
+    print("\nPDF - contains_key example 2")
+    print("----------------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.contains_key(str(key))
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    print(result)
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nPDF - clear example 1")
+    print("---------------------")
+    m = HashMap(101, hash_function_1)
+    print(m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key1', 30)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nPDF - clear example 2")
+    print("---------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.get_size(), m.get_capacity())
+    m.resize_table(100)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+
+    print("\nPDF - __iter__(), __next__() example 1")
+    print("---------------------")
+    m = HashMap(10, hash_function_1)
+    for i in range(5):
+        m.put(str(i), str(i * 10))
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
+
+    print("\nPDF - __iter__(), __next__() example 2")
+    print("---------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
+
+    print("\ntombstone compaction example 1")
+    print("------------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(2000):
+        m.put('session' + str(i), i)
+        if i >= 20:
+            m.remove('session' + str(i - 20))
+        if i % 400 == 399:
+            print(m.get_size(), m.get_tombstones(), m.empty_buckets(), m.get_capacity())
+
+
+    print("\npickle / dump example 1")
+    print("-----------------------")
+    import io
+    import pickle
+    m = HashMap(11, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i), i * 10)
+    for i in range(0, 50, 5):
+        m.remove('str' + str(i))
+    buffers = []
+    data = pickle.dumps(m, protocol=5, buffer_callback=buffers.append)
+    copy = pickle.loads(data, buffers=buffers)
+    file = io.BytesIO()
+    m.dump(file)
+    file.seek(0)
+    loaded = HashMap.load(file)
+    for restored in (copy, loaded):
+        result = all(restored.get('str' + str(i)) == (None if i % 5 == 0 else i * 10)
+                     for i in range(50))
+        print(result, restored.get_size(), restored.get_capacity(), len(buffers))
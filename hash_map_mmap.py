@@ -0,0 +1,689 @@
+# Name: Aubrey Floyd
+# Course: CS261 - Data Structures
+# Description: Implementation of a persistent open addressing HashMap stored in a memory-mapped
+#              file. The file holds a fixed header, a slot table laid out like the hash_map_oa
+#              table (prime or power-of-two capacity, quadratic or triangular probing,
+#              tombstones) with a cached hash and a record offset per slot, and a heap of
+#              serialized key/value records. Opening a file maps it without reading the table,
+#              and a lookup deserializes only the value it returns. Class includes methods: put,
+#              get, remove, contains_key, clear, empty_buckets, resize_table, table_load,
+#              get_keys_and_values, __iter__, keys, values, items, flush, and close.
+
+import io
+import mmap
+import os
+import pickle
+import struct
+
+from a6_include import (DETERMINISTIC_HASH_FUNCTIONS, DynamicArray, HashEntry, HashMapIterator,
+                        ItemsView, KeysView, MixedHash, ValuesView, get_hash_function)
+
+
+# file layout: header, then capacity slots, then the record heap
+#   header  magic, version, flags, capacity, size, tombstones, end of heap, hash function name
+#   slot    full 64-bit hash, file offset of the record (or _EMPTY / _TOMBSTONE)
+#   record  key length, value length, pickled key, pickled value
+_HEADER = struct.Struct('<8sIIQQQQ16s')
+_SLOT = struct.Struct('<QQ')
+_RECORD = struct.Struct('<II')
+
+MAGIC = b'A6HASHMP'
+VERSION = 1
+
+# header flags
+POWER_OF_TWO = 1
+
+# slot offsets below the header can't point at a record, so they mark slot states
+_EMPTY = 0
+_TOMBSTONE = 1
+
+# stored hashes are unsigned 64-bit values
+_HASH_MASK = (1 << 64) - 1
+
+# fixed so that a key serializes to the same bytes whatever the Python version
+_PICKLE_PROTOCOL = 4
+
+# stored keys are compared by their pickled bytes, which are equal exactly when the keys are
+# equal only for these types: 1, 1.0 and True are equal but pickle differently, and a set
+# pickles in an order that depends on PYTHONHASHSEED
+KEY_TYPES = (str, bytes, int)
+
+
+def _key_bytes(key) -> bytes:
+    """
+    Serializes a key for storing or comparing, see KEY_TYPES.
+    Raises TypeError for keys of any other type, including bool.
+    """
+    if type(key) not in KEY_TYPES:
+        raise TypeError(f"keys must be str, bytes or int, not {type(key).__name__}")
+    return pickle.dumps(key, _PICKLE_PROTOCOL)
+
+
+class MmapHashMap:
+    def __init__(self, path: str, capacity: int = 11, function: str = 'fnv1a',
+                 power_of_two: bool = False, readonly: bool = False) -> None:
+        """
+        Open the hash map stored in the file at path, creating the file if it doesn't
+        exist. capacity, function and power_of_two only apply to a new file; an existing
+        file keeps the ones recorded in its header
+        function must be one of a6_include.DETERMINISTIC_HASH_FUNCTIONS, since the
+        stored hashes have to mean the same in every process that opens the file
+        If readonly is True the file is mapped read-only so worker processes can share
+        it, and methods that change the map raise io.UnsupportedOperation
+        Keys must be str, bytes or int (not bool); other keys raise TypeError
+        """
+        self._path = path
+        self._readonly = readonly
+        self._mod_count = 0
+
+        if readonly or (os.path.exists(path) and os.path.getsize(path) > 0):
+            self._open()
+            return
+
+        if function not in DETERMINISTIC_HASH_FUNCTIONS:
+            raise ValueError(f"function must be one of {', '.join(DETERMINISTIC_HASH_FUNCTIONS)}")
+
+        # capacity must be a prime number, or a power of two in power_of_two mode
+        self._power_of_two = power_of_two
+        self._function_name = function
+        if power_of_two:
+            capacity = 1 << max(capacity - 1, 1).bit_length()
+        else:
+            capacity = self._next_prime(capacity)
+        self._write_file(path, capacity, [])
+        self._open()
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            key_hash, offset = _SLOT.unpack_from(self._mm, _HEADER.size + i * _SLOT.size)
+            if offset == _EMPTY:
+                out += str(i) + ': None\n'
+            elif offset == _TOMBSTONE:
+                out += str(i) + ': tombstone\n'
+            else:
+                out += str(i) + ': ' + str(self._entry(offset, key_hash)) + '\n'
+        return out
+
+    def __enter__(self) -> "MmapHashMap":
+        """
+        Return the map for use in a with statement
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Close the map at the end of a with statement
+        """
+        self.close()
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get_tombstones(self) -> int:
+        """
+        Return number of tombstones in the hash table
+        """
+        return self._tombstones
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: object, value: object) -> None:
+        """
+        Updates key/value pair in hash map. Resizes table if needed. O(1) average time complexity.
+        The record is appended to the heap; an overwritten record stays in the file as garbage
+        until the next resize.
+        :param key: key to be added
+        :param value: value to be added
+        :return: none
+        """
+
+        self._check_writable()
+
+        # tombstones count toward the 0.5 limit like in hash_map_oa; resize double if
+        # needed, or rebuild at the same capacity when tombstones outnumber live entries
+        if (self._size + self._tombstones) / self._capacity >= 0.5:
+            if self._tombstones > self._size:
+                self.resize_table(self._capacity)
+            else:
+                self.resize_table(self._capacity * 2)
+
+        key_bytes = _key_bytes(key)
+        key_hash = self._hash_function(key) & _HASH_MASK
+        index, insert_index = self._probe(key_hash, key_bytes)
+
+        value_bytes = pickle.dumps(value, _PICKLE_PROTOCOL)
+        record = _RECORD.pack(len(key_bytes), len(value_bytes)) + key_bytes + value_bytes
+        offset = self._append(record)
+
+        # replace the existing key's record, or fill the first tombstone or open slot
+        if index is None:
+            index = insert_index
+            if self._slot(index)[1] == _TOMBSTONE:
+                self._tombstones -= 1
+            self._size += 1
+            self._mod_count += 1
+        _SLOT.pack_into(self._mm, _HEADER.size + index * _SLOT.size, key_hash, offset)
+        self._write_header()
+
+
+    def table_load(self) -> float:
+        """
+        Finds current hash table load factor. O(1) time complexity.
+        No parameters.
+        :return: float value of load factor
+        """
+
+        return self._size / self._capacity
+
+
+    def empty_buckets(self) -> int:
+        """
+        Finds number of empty buckets in hash table. O(1) time complexity.
+        No parameters.
+        :return: integer values of number of empty buckets
+        """
+
+        return self._capacity - self._size - self._tombstones
+
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes capacity of the hash table by writing a new file beside the old one and
+        replacing it. Live records are copied as bytes, without deserializing them, and
+        garbage left by overwrites and removes is dropped.
+        :param new_capacity: new capacity size of hash table
+        :return: none
+        """
+
+        self._check_writable()
+
+        # check if new capacity is less than current number of elements
+        if new_capacity <= self._size:
+            return
+
+        # make sure new capacity fits the table's mode and load factor is at most 0.5
+        if self._power_of_two:
+            new_capacity = 1 << max(new_capacity - 1, 1).bit_length()
+            while self._size / new_capacity > 0.5:
+                new_capacity *= 2
+        else:
+            while not (self._is_prime(new_capacity) and (self._size / new_capacity <= 0.5)):
+                if not self._is_prime(new_capacity):
+                    new_capacity = self._next_prime(new_capacity)
+                if not self._size / new_capacity <= 0.5:
+                    new_capacity *= 2
+
+        records = []
+        for i in range(self._capacity):
+            key_hash, offset = self._slot(i)
+            if offset > _TOMBSTONE:
+                key_length, value_length = _RECORD.unpack_from(self._mm, offset)
+                end = offset + _RECORD.size + key_length + value_length
+                records.append((key_hash, self._mm[offset:end]))
+
+        temp_path = self._path + '.resize'
+        self._write_file(temp_path, new_capacity, records)
+        self._close_file()
+        os.replace(temp_path, self._path)
+        self._open()
+        self._mod_count += 1
+
+
+    def get(self, key: object) -> object:
+        """
+        Gets value associated with given key, or None if key doesn't exist.
+        Only the matching record's value is deserialized. O(1) average time complexity.
+        :param key: key to get value from
+        :return: value at key
+        """
+
+        index = self._find(key)
+        if index is None:
+            return None
+
+        offset = self._slot(index)[1]
+        key_length, value_length = _RECORD.unpack_from(self._mm, offset)
+        start = offset + _RECORD.size + key_length
+        return pickle.loads(self._mm[start:start + value_length])
+
+
+    def contains_key(self, key: object) -> bool:
+        """
+        Checks if given key is in hash map. O(1) average time complexity.
+        :param key: key to check for in hash map
+        :return: bool value, True if exists otherwise False
+        """
+
+        return self._find(key) is not None
+
+
+    def remove(self, key: object) -> None:
+        """
+        Removes given key and value from hash map by marking its slot a tombstone.
+        O(1) average time complexity.
+        :param key: key for key/value pair to be removed
+        :return: none
+        """
+
+        self._check_writable()
+
+        index = self._find(key)
+        if index is None:
+            return
+
+        key_hash = self._slot(index)[0]
+        _SLOT.pack_into(self._mm, _HEADER.size + index * _SLOT.size, key_hash, _TOMBSTONE)
+        self._size -= 1
+        self._tombstones += 1
+        self._mod_count += 1
+        self._write_header()
+
+
+    def clear(self) -> None:
+        """
+        Clears contents of the hash map without changing underlying hash table capacity.
+        The file is rewritten empty, dropping every record.
+        No parameters.
+        :return: none
+        """
+
+        self._check_writable()
+
+        self._close_file()
+        self._write_file(self._path, self._capacity, [])
+        self._open()
+        self._mod_count += 1
+
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a dynamic array where each index contains a tuple key/value pair stored in the
+        hash map.
+        No parameters.
+        :return: Dynamic Array with tuples
+        """
+
+        keys_values = DynamicArray()
+        for entry in self._entries():
+            keys_values.append((entry.key, entry.value))
+        return keys_values
+
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Creates an independent iterator across the hash map's entries, deserialized one at
+        a time. It raises RuntimeError if the map is modified during iteration.
+        :return: iterator of HashEntry objects
+        """
+
+        return HashMapIterator(self, self._entries())
+
+
+    def keys(self) -> KeysView:
+        """
+        Creates a lazy view of the keys.
+        :return: KeysView of the hash map
+        """
+
+        return KeysView(self)
+
+
+    def values(self) -> ValuesView:
+        """
+        Creates a lazy view of the values.
+        :return: ValuesView of the hash map
+        """
+
+        return ValuesView(self)
+
+
+    def items(self) -> ItemsView:
+        """
+        Creates a lazy view of the (key, value) pairs.
+        :return: ItemsView of the hash map
+        """
+
+        return ItemsView(self)
+
+
+    def flush(self) -> None:
+        """
+        Writes changes made through the memory map back to the file.
+        :return: none
+        """
+
+        if not self._readonly:
+            self._mm.flush()
+
+
+    def close(self) -> None:
+        """
+        Flushes and closes the file. The map can't be used afterwards.
+        :return: none
+        """
+
+        if self._mm is not None:
+            self.flush()
+            self._close_file()
+
+    # ------------------------------------------------------------------ #
+
+    def _open(self) -> None:
+        """
+        Maps the file and reads its header. The slot table and heap are left on disk until
+        a lookup touches them, so opening is O(1).
+        :return: none
+        """
+
+        self._file = open(self._path, 'rb' if self._readonly else 'r+b')
+        try:
+            access = mmap.ACCESS_READ if self._readonly else mmap.ACCESS_WRITE
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=access)
+        except (OSError, ValueError):
+            self._file.close()
+            raise ValueError(f"{self._path} is not a hash map file") from None
+
+        if len(self._mm) < _HEADER.size:
+            self._close_file()
+            raise ValueError(f"{self._path} is not a hash map file")
+        (magic, version, flags, self._capacity, self._size, self._tombstones,
+         self._data_end, name) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._close_file()
+            raise ValueError(f"{self._path} is not a version {VERSION} hash map file")
+
+        self._power_of_two = bool(flags & POWER_OF_TWO)
+        self._function_name = name.rstrip(b'\0').decode('ascii')
+        self._hash_function = get_hash_function(self._function_name)
+        if self._power_of_two:
+            self._hash_function = MixedHash(self._hash_function)
+
+
+    def _close_file(self) -> None:
+        """
+        Unmaps and closes the file without flushing.
+        :return: none
+        """
+
+        self._mm.close()
+        self._file.close()
+        self._mm = None
+
+
+    def _write_file(self, path: str, capacity: int, records: list) -> None:
+        """
+        Writes a complete map file: header, a slot table with every record placed by its
+        hash, and the records packed into the heap.
+        :param path: file to write
+        :param capacity: capacity of the slot table
+        :param records: list of (hash, record bytes) pairs with distinct keys
+        :return: none
+        """
+
+        table = bytearray(_SLOT.size * capacity)
+        heap_start = _HEADER.size + len(table)
+        offset = heap_start
+
+        with open(path, 'wb') as file:
+            file.seek(heap_start)
+            for key_hash, record in records:
+                index = self._home(key_hash, capacity)
+                initial_index = index
+                probing = 1
+                while _SLOT.unpack_from(table, index * _SLOT.size)[1] != _EMPTY:
+                    index = self._next_index(initial_index, probing, capacity)
+                    probing += 1
+
+                _SLOT.pack_into(table, index * _SLOT.size, key_hash, offset)
+                file.write(record)
+                offset += len(record)
+
+            flags = POWER_OF_TWO if self._power_of_two else 0
+            file.seek(0)
+            file.write(_HEADER.pack(MAGIC, VERSION, flags, capacity, len(records), 0, offset,
+                                    self._function_name.encode('ascii')))
+            file.write(table)
+
+
+    def _write_header(self) -> None:
+        """
+        Writes the current size, tombstone count and end of heap into the header.
+        :return: none
+        """
+
+        flags = POWER_OF_TWO if self._power_of_two else 0
+        _HEADER.pack_into(self._mm, 0, MAGIC, VERSION, flags, self._capacity, self._size,
+                          self._tombstones, self._data_end, self._function_name.encode('ascii'))
+
+
+    def _check_writable(self) -> None:
+        """
+        Raises io.UnsupportedOperation if the map was opened read-only.
+        :return: none
+        """
+
+        if self._readonly:
+            raise io.UnsupportedOperation(f"{self._path} is open read-only")
+
+
+    def _append(self, record: bytes) -> int:
+        """
+        Appends a record to the heap, growing the file by doubling when it is full.
+        :param record: packed record bytes
+        :return: file offset of the record
+        """
+
+        offset = self._data_end
+        end = offset + len(record)
+        if end > len(self._mm):
+            new_length = max(end, 2 * len(self._mm))
+            self._mm.close()
+            self._file.truncate(new_length)
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE)
+
+        self._mm[offset:end] = record
+        self._data_end = end
+        return offset
+
+
+    def _slot(self, index: int) -> tuple:
+        """
+        Reads one slot of the table.
+        :param index: slot index
+        :return: tuple of (hash, record offset or _EMPTY or _TOMBSTONE)
+        """
+
+        return _SLOT.unpack_from(self._mm, _HEADER.size + index * _SLOT.size)
+
+
+    def _home(self, key_hash: int, capacity: int) -> int:
+        """
+        Finds the first slot of a hash's probe sequence.
+        :param key_hash: stored 64-bit hash
+        :param capacity: capacity of the table being probed
+        :return: slot index, hash % capacity, or a bitmask in power of two mode
+        """
+
+        if self._power_of_two:
+            return key_hash & (capacity - 1)
+        return key_hash % capacity
+
+
+    def _next_index(self, initial_index: int, probing: int, capacity: int) -> int:
+        """
+        Finds the slot a probe sequence visits after probing collisions.
+        :param initial_index: first slot of the probe sequence
+        :param probing: number of slots already visited
+        :param capacity: capacity of the table being probed
+        :return: initial + p^2 mod capacity, or initial + p(p+1)/2 masked in power of two mode
+        """
+
+        if self._power_of_two:
+            return (initial_index + (probing * probing + probing) // 2) & (capacity - 1)
+        return (initial_index + probing * probing) % capacity
+
+
+    def _probe(self, key_hash: int, key_bytes: bytes) -> tuple:
+        """
+        Probes for a key, comparing stored hashes first and serialized keys only when the
+        hashes match.
+        :param key_hash: 64-bit hash of key
+        :param key_bytes: pickled key
+        :return: tuple of (slot holding key or None, first tombstone or empty slot seen)
+        """
+
+        index = self._home(key_hash, self._capacity)
+        initial_index = index
+        probing = 1
+        insert_index = None
+
+        # a prime table's probe sequence repeats after capacity probes, and a small table
+        # just under load 0.5 can fill every slot it reaches; put() grows before that
+        while probing <= self._capacity:
+            stored_hash, offset = self._slot(index)
+            if offset == _EMPTY:
+                return None, index if insert_index is None else insert_index
+            if offset == _TOMBSTONE:
+                if insert_index is None:
+                    insert_index = index
+            elif stored_hash == key_hash:
+                key_length = _RECORD.unpack_from(self._mm, offset)[0]
+                start = offset + _RECORD.size
+                if key_length == len(key_bytes) and self._mm[start:start + key_length] == key_bytes:
+                    return index, insert_index
+            index = self._next_index(initial_index, probing, self._capacity)
+            probing += 1
+        return None, insert_index
+
+
+    def _find(self, key: object) -> int:
+        """
+        Finds the slot holding key.
+        :param key: key to look for
+        :return: slot index, or None if key isn't in the hash map
+        """
+
+        key_hash = self._hash_function(key) & _HASH_MASK
+        return self._probe(key_hash, _key_bytes(key))[0]
+
+
+    def _entry(self, offset: int, key_hash: int) -> HashEntry:
+        """
+        Deserializes the record at offset.
+        :param offset: file offset of the record
+        :param key_hash: stored hash of the record's key
+        :return: HashEntry holding the key and value
+        """
+
+        key_length, value_length = _RECORD.unpack_from(self._mm, offset)
+        start = offset + _RECORD.size
+        key = pickle.loads(self._mm[start:start + key_length])
+        value = pickle.loads(self._mm[start + key_length:start + key_length + value_length])
+        return HashEntry(key, value, key_hash)
+
+
+    def _entries(self):
+        """
+        Starts a walk over the live records, deserializing each one as it is reached.
+        :return: generator of HashEntry objects
+        """
+
+        return (self._entry(offset, key_hash)
+                for key_hash, offset in map(self._slot, range(self._capacity))
+                if offset > _TOMBSTONE)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'example.a6map')
+
+    print("\nput / get / remove example 1")
+    print("----------------------------")
+    with MmapHashMap(path, 53, 'fnv1a') as m:
+        for i in range(150):
+            m.put('str' + str(i), i * 100)
+            if i % 25 == 24:
+                print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+        for i in range(0, 150, 3):
+            m.remove('str' + str(i))
+        m.put('str1', {'nested': [1, 2, 3]})
+        print(m.get_size(), m.get_tombstones(), m.get('str1'), m.get('str0'), m.contains_key('str2'))
+
+    print("\nreopen example 1")
+    print("----------------")
+    with MmapHashMap(path) as m:
+        result = all(m.get('str' + str(i)) == (None if i % 3 == 0 else i * 100)
+                     for i in range(2, 150))
+        print(result, m.get_size(), m.get_capacity(), m.get('str1'))
+
+    print("\nread-only example 1")
+    print("-------------------")
+    with MmapHashMap(path, readonly=True) as m:
+        print(m.get('str5'), len(m.keys()), sorted(m.keys())[:3])
+        try:
+            m.put('str5', 0)
+        except io.UnsupportedOperation as error:
+            print('UnsupportedOperation:', os.path.basename(str(error)))
+
+    print("\npower of two example 1")
+    print("----------------------")
+    os.remove(path)
+    with MmapHashMap(path, 10, 'hash_function_2', power_of_two=True) as m:
+        for i in range(1, 6):
+            m.put(str(i), str(i * 10))
+        m.resize_table(2)
+        print(m.get_capacity(), sorted(m.items()))
+        m.clear()
+        print(m.get_size(), m.get_capacity(), m.get('1'))
+
+    os.remove(path)
+    os.rmdir(directory)
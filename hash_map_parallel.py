@@ -0,0 +1,218 @@
+# Name: Aubrey Floyd
+# Course: CS261 - Data Structures
+# Description: Parallel bulk build of a HashMap from an iterable of key/value pairs. Input is read
+#              in chunks; a pool of worker processes hashes each chunk once and splits it by key
+#              hash into one batch per partition. Every partition is owned by a long-lived
+#              process that receives its batches as they are split and, once the input ends,
+#              builds the partition's map in one pass sized for all of them, reusing the hashes.
+#              Partitions hold disjoint keys, so they either become the shards of a
+#              ShardedHashMap or are merged into one HashMap sized once for their exact total.
+
+import collections
+import concurrent.futures
+import itertools
+import multiprocessing
+import pickle
+
+from a6_include import DETERMINISTIC_HASH_FUNCTIONS, get_hash_function, pack_ints, unpack_ints
+import hash_map_oa
+import hash_map_sc
+from hash_map_sharded import ShardedHashMap, shard_hash, shard_index
+
+
+def build_parallel(iterable, workers: int = 4, map_class: type = hash_map_sc.HashMap,
+                   function='fnv1a', combine: callable = None, sharded: bool = False,
+                   chunk_size: int = 100000, **options):
+    """
+    Builds a HashMap from (key, value) pairs using a pool of worker processes that hash and
+    split the input and one owner process per partition that builds it.
+    :param iterable: iterable of (key, value) pairs, read one chunk at a time
+    :param workers: number of pool processes, also the number of partitions and owners
+    :param map_class: hash_map_sc.HashMap or hash_map_oa.HashMap
+    :param function: hash function, one of a6_include.DETERMINISTIC_HASH_FUNCTIONS or a
+                     module-level function that hashes equally in every process
+    :param combine: function of (earlier value, later value) giving the value of a repeated
+                    key; None keeps the later value
+    :param sharded: return a ShardedHashMap with one shard per partition instead of one map
+    :param chunk_size: number of pairs sent to a worker at a time
+    :param options: options for the map constructor (power_of_two, stats, ...)
+    :return: built map of map_class, or a ShardedHashMap of them
+    """
+
+    # workers partition by hash, so every process must hash a key the same way
+    if isinstance(function, str) and function not in DETERMINISTIC_HASH_FUNCTIONS:
+        raise ValueError(f"function must be one of {', '.join(DETERMINISTIC_HASH_FUNCTIONS)}")
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    # one owner process per partition collects that partition's batches; its inbox is
+    # bounded, so the parent waits whenever an owner falls behind
+    inboxes = [multiprocessing.Queue(2) for _ in range(workers)]
+    results = multiprocessing.Queue()
+    owners = [multiprocessing.Process(target=_own_partition,
+                                      args=(inbox, results, partition, map_class, function,
+                                            combine, options))
+              for partition, inbox in enumerate(inboxes)]
+    for owner in owners:
+        owner.start()
+
+    # the parent holds only the chunks in flight, a few per worker, and hands each chunk's
+    # batches to the owners oldest first, so each partition receives them in input order
+    rows = iter(iterable)
+    merged = [None] * workers
+    try:
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            pending = collections.deque()
+            while True:
+                while len(pending) < 2 * workers:
+                    chunk = list(itertools.islice(rows, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(executor.submit(_split_rows, chunk, workers, function))
+                if not pending:
+                    break
+
+                for inbox, batch in zip(inboxes, pending.popleft().result()):
+                    if batch[0]:
+                        inbox.put(batch)
+
+        for inbox in inboxes:
+            inbox.put(None)
+        for _ in range(workers):
+            partition, partition_map = results.get()
+            if isinstance(partition_map, BaseException):
+                raise partition_map
+            merged[partition] = partition_map
+    finally:
+        # after an error, owners still waiting for batches are stopped
+        for owner, partition_map in zip(owners, merged):
+            if partition_map is None:
+                owner.terminate()
+            owner.join()
+
+    if sharded:
+        return ShardedHashMap.from_shards(merged, function)
+
+    # partitions share no keys, so their sizes add up to the exact size of the result
+    total = sum(partition_map.get_size() for partition_map in merged)
+    result = map_class(_capacity_for(map_class, total), function, **options)
+    for partition_map in merged:
+        result.merge(partition_map)
+    return result
+
+
+def _split_rows(rows: list, partitions: int, function) -> list:
+    """
+    Worker task: hashes a chunk of rows and splits them by partition.
+    :param rows: list of (key, value) pairs
+    :param partitions: number of partitions
+    :param function: hash function or registered name
+    :return: list of (keys, values, packed hashes) batches, one per partition
+    """
+
+    hash_function = get_hash_function(function)
+    batches = [([], [], []) for _ in range(partitions)]
+    for key, value in rows:
+        key_hash = hash_function(key)
+        keys, values, hashes = batches[shard_index(key_hash, partitions)]
+        keys.append(key)
+        values.append(value)
+        hashes.append(key_hash)
+
+    # hashes travel back as one 64-bit array rather than a list of int objects
+    return [(keys, values, pack_ints(hashes, pickle.DEFAULT_PROTOCOL))
+            for keys, values, hashes in batches]
+
+
+def _own_partition(inbox, results, partition: int, map_class: type, function,
+                   combine: callable, options: dict) -> None:
+    """
+    Owner process: collects one partition's batches from inbox until None arrives, then
+    builds the partition and puts (partition, map) on results, or (partition, exception)
+    if the build fails.
+    :param inbox: queue of the partition's (keys, values, packed hashes) batches
+    :param results: queue shared by all owners for the built maps
+    :param partition: index of the partition
+    :param map_class: HashMap class to build
+    :param function: hash function or registered name
+    :param combine: function combining the values of a repeated key, or None
+    :param options: options for the map constructor
+    :return: none
+    """
+
+    batches = []
+    for batch in iter(inbox.get, None):
+        batches.append(batch)
+    try:
+        results.put((partition, _build_partition(batches, map_class, function, combine,
+                                                 options)))
+    except Exception as error:
+        results.put((partition, error))
+
+
+def _build_partition(batches: list, map_class: type, function, combine: callable,
+                     options: dict):
+    """
+    Puts one partition's batches into a new map with the hashes _split_rows()
+    computed, so no key is hashed twice.
+    :param batches: the partition's (keys, values, packed hashes) batches, earlier chunks first
+    :param map_class: HashMap class to build
+    :param function: hash function or registered name
+    :param combine: function combining the values of a repeated key, or None
+    :param options: options for the map constructor
+    :return: built map
+    """
+
+    # size for every row, so the map never grows while the batches go in
+    hash_function = get_hash_function(function)
+    rows = sum(len(keys) for keys, _, _ in batches)
+    hash_map = map_class(_capacity_for(map_class, rows), hash_function, **options)
+    for keys, values, hashes in batches:
+        for key, value, key_hash in zip(keys, values, unpack_ints(hashes)):
+            hash_map._merge_entry(key, value, shard_hash(hash_map, hash_function, key_hash, key),
+                                  combine)
+    return hash_map
+
+
+def _capacity_for(map_class: type, size: int) -> int:
+    """
+    Finds a capacity that holds size entries without growing.
+    :param map_class: HashMap class
+    :param size: number of entries
+    :return: capacity to pass to the constructor
+    """
+
+    if map_class is hash_map_oa.HashMap:
+        return 2 * size + 1
+    return max(size, 1)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import operator
+
+    print("\nbuild_parallel example 1")
+    print("------------------------")
+    pairs = (('word' + str(i % 5000), 1) for i in range(40000))
+    m = build_parallel(pairs, 4, combine=operator.add, chunk_size=5000)
+    print(m.get_size(), m.get_capacity(), m.get('word0'), m.get('word4999'), m.get('word5000'))
+
+    print("\nbuild_parallel example 2")
+    print("------------------------")
+    pairs = ((i, i * i) for i in range(20000))
+    m = build_parallel(pairs, 3, hash_map_oa.HashMap, sharded=True, chunk_size=4000,
+                       power_of_two=True)
+    result = all(m.get(i) == i * i for i in range(0, 20000, 7))
+    print(result, m.get_size(), m.get_shard_count(), m.contains_key(20000))
+
+    print("\nmerge example 1")
+    print("---------------")
+    a = hash_map_sc.HashMap(11, 'fnv1a')
+    b = hash_map_oa.HashMap(11, 'fnv1a')
+    for i in range(10):
+        a.put('k' + str(i), i)
+        b.put('k' + str(i + 5), 100)
+    a.merge(b, operator.add)
+    print(a.get_size(), a.get('k0'), a.get('k7'), a.get('k14'))
@@ -0,0 +1,449 @@
+# Name: Aubrey Floyd
+# Course: CS261 - Data Structures
+# Description: Implementation of a HashMap class making use of a dynamic array to store a hash
+#              table with open addressing using Robin Hood linear probing for collision
+#              resolution and backward-shift deletion, so no tombstones are ever left behind.
+#              Probe lengths stay short and even, which lets the table run at a much higher
+#              load factor than quadratic probing. Class includes methods: put, get, remove,
+#              contains_key, clear, empty_buckets, resize_table, table_load,
+#              get_keys_and_values, __iter__, keys, values, and items.
+
+from a6_include import (DynamicArray, HashEntry, HashMapIterator, ItemsView, KeysView,
+                        ValuesView, get_hash_function, hash_function_1, hash_function_2)
+
+
+class HashMap:
+    def __init__(self, capacity: int, function, max_load: float = 0.875) -> None:
+        """
+        Initialize new HashMap that uses Robin Hood linear probing
+        for collision resolution
+        function may be a hash function or the name of one registered in
+        a6_include.HASH_FUNCTIONS
+        max_load is the load factor the table grows at, below 1
+        """
+        if not 0 < max_load < 1:
+            raise ValueError("max_load must be between 0 and 1")
+
+        self._buckets = DynamicArray()
+
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        for _ in range(self._capacity):
+            self._buckets.append(None)
+
+        self._hash_function = get_hash_function(function)
+        self._max_load = max_load
+        self._size = 0
+
+        # structural modifications, checked by iterators
+        self._mod_count = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._buckets.length()):
+            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates key/value pair in hash map. Resizes table if needed. O(1) average time complexity.
+        An entry that has probed further than the one occupying a slot takes that slot, and the
+        displaced entry continues probing.
+        :param key: key to be added
+        :param value: value to be added
+        :return: none
+        """
+
+        key_hash = self._hash_function(key)
+
+        # check if the insert would pass the maximum load factor, resize double if needed;
+        # overwriting an existing key adds no entry, so it never resizes
+        if (self._size + 1) / self._capacity > self._max_load:
+            index = self._find(key, key_hash)
+            if index is not None:
+                self._buckets[index].value = value
+                return
+            self.resize_table(self._capacity * 2)
+
+        buckets, capacity = self._buckets, self._capacity
+
+        # probe linearly, tracking how far the entry being placed is from its home slot
+        index = key_hash % capacity
+        distance = 0
+        entry = None
+        while buckets[index] is not None:
+            element = buckets[index]
+
+            # until the new entry has displaced anything, an equal key can still be found
+            if entry is None and element.hash == key_hash and element.key == key:
+                element.value = value
+                return
+
+            element_distance = (index - element.hash % capacity) % capacity
+            if element_distance < distance:
+                if entry is None:
+                    entry = HashEntry(key, value, key_hash)
+                buckets[index], entry = entry, element
+                distance = element_distance
+
+            index = (index + 1) % capacity
+            distance += 1
+
+        buckets[index] = entry if entry is not None else HashEntry(key, value, key_hash)
+        self._size += 1
+        self._mod_count += 1
+
+
+    def table_load(self) -> float:
+        """
+        Finds current hash table load factor. O(1) average time complexity.
+        No parameters.
+        :return: float value of load factor
+        """
+
+        # load factor = # of elements in table / # of buckets
+        return self._size / self._capacity
+
+
+    def empty_buckets(self) -> int:
+        """
+        Finds number of empty buckets in hash table. O(1) time complexity.
+        No parameters.
+        :return: integer values of number of empty buckets
+        """
+
+        # without tombstones every bucket not holding an entry is empty
+        return self._capacity - self._size
+
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes capacity of internal hash table while maintaining key/value pairs in hash map.
+        :param new_capacity: new capacity size of hash table
+        :return: none
+        """
+
+        # check if new capacity is less than current number of elements
+        if new_capacity <= self._size:
+            return
+
+        # make sure new capacity is prime and load factor is at most the maximum
+        while not (self._is_prime(new_capacity) and self._size / new_capacity <= self._max_load):
+            if not self._is_prime(new_capacity):
+                new_capacity = self._next_prime(new_capacity)
+            if not self._size / new_capacity <= self._max_load:
+                new_capacity *= 2
+
+        new_buckets = DynamicArray()
+        for _ in range(new_capacity):
+            new_buckets.append(None)
+
+        # place every entry from its cached hash, keys are unique so no comparisons needed
+        for i in range(self._capacity):
+            entry = self._buckets[i]
+            if entry is None:
+                continue
+
+            index = entry.hash % new_capacity
+            distance = 0
+            while new_buckets[index] is not None:
+                element = new_buckets[index]
+                element_distance = (index - element.hash % new_capacity) % new_capacity
+                if element_distance < distance:
+                    new_buckets[index], entry = entry, element
+                    distance = element_distance
+                index = (index + 1) % new_capacity
+                distance += 1
+            new_buckets[index] = entry
+
+        self._buckets = new_buckets
+        self._capacity = new_capacity
+        self._mod_count += 1
+
+
+    def get(self, key: str) -> object:
+        """
+        Gets value associated with given key, or None if key doesn't exist.
+        O(1) average time complexity.
+        :param key: key to get value from
+        :return: value at key
+        """
+
+        index = self._find(key, self._hash_function(key))
+        if index is not None:
+            return self._buckets[index].value
+
+        # if key not in hash map, returns None
+        return None
+
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if given key is in hash map. O(1) average time complexity.
+        :param key: key to check for in hash map
+        :return: bool value, True if exists otherwise False
+        """
+
+        # if key not in hash map, returns False
+        return self._find(key, self._hash_function(key)) is not None
+
+
+    def remove(self, key: str) -> None:
+        """
+        Removes given key and value from hash map. O(1) average time complexity.
+        Following entries that are away from their home slot shift back one slot each,
+        so the table never holds tombstones.
+        :param key: key for key/value pair to be removed
+        :return: none
+        """
+
+        index = self._find(key, self._hash_function(key))
+        if index is None:
+            return
+
+        # shift back until an empty slot or an entry already in its home slot
+        buckets, capacity = self._buckets, self._capacity
+        next_index = (index + 1) % capacity
+        while buckets[next_index] is not None and buckets[next_index].hash % capacity != next_index:
+            buckets[index] = buckets[next_index]
+            index = next_index
+            next_index = (next_index + 1) % capacity
+
+        buckets[index] = None
+        self._size -= 1
+        self._mod_count += 1
+
+
+    def clear(self) -> None:
+        """
+        Clears contents of the hash map without changing underlying hash table capacity.
+        No parameters.
+        :return: none
+        """
+
+        # clear buckets and size
+        new_buckets = DynamicArray()
+        for _ in range(self._capacity):
+            new_buckets.append(None)
+
+        self._buckets = new_buckets
+        self._size = 0
+        self._mod_count += 1
+
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a dynamic array where each index contains a tuple key/value pair stores in the
+        hash map.
+        No parameters.
+        :return: Dynamic Array with tuples
+        """
+
+        # initialize dynamic array, order of the keys does not matter
+        keys_values = DynamicArray()
+
+        # add each key/value tuple to array
+        for i in range(self._capacity):
+            element = self._buckets[i]
+            if element is not None:
+                keys_values.append((element.key, element.value))
+        return keys_values
+
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Creates an independent iterator across the hash map's entries. Each call returns a new
+        iterator, so loops can be nested, and it raises RuntimeError if the map is modified
+        during iteration.
+        :return: iterator of HashEntry objects
+        """
+
+        return HashMapIterator(self, self._entries())
+
+
+    def keys(self) -> KeysView:
+        """
+        Creates a lazy view of the keys that walks the buckets without copying them.
+        :return: KeysView of the hash map
+        """
+
+        return KeysView(self)
+
+
+    def values(self) -> ValuesView:
+        """
+        Creates a lazy view of the values that walks the buckets without copying them.
+        :return: ValuesView of the hash map
+        """
+
+        return ValuesView(self)
+
+
+    def items(self) -> ItemsView:
+        """
+        Creates a lazy view of the (key, value) pairs that walks the buckets without copying them.
+        :return: ItemsView of the hash map
+        """
+
+        return ItemsView(self)
+
+    # ------------------------------------------------------------------ #
+
+    def _entries(self):
+        """
+        Starts a walk over the entries, reading the buckets in place.
+        :return: generator of HashEntry objects
+        """
+
+        return (element for element in self._buckets.storage() if element is not None)
+
+
+    def _find(self, key: str, key_hash: int):
+        """
+        Probes for the slot holding key. The search stops early at the first entry closer to
+        its home slot than the key would be, since Robin Hood placement would have put the
+        key before it.
+        :param key: key to look for
+        :param key_hash: full hash of key
+        :return: slot index, or None if key isn't in the hash map
+        """
+
+        buckets, capacity = self._buckets, self._capacity
+
+        index = key_hash % capacity
+        distance = 0
+        while buckets[index] is not None:
+            element = buckets[index]
+            if (index - element.hash % capacity) % capacity < distance:
+                return None
+            if element.hash == key_hash and element.key == key:
+                return index
+            index = (index + 1) % capacity
+            distance += 1
+        return None
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput example 1")
+    print("-------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nput example 2")
+    print("-------------")
+    m = HashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nresize example 1")
+    print("----------------")
+    m = HashMap(75, hash_function_2)
+    keys = [i for i in range(25, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nget / remove example 1")
+    print("----------------------")
+    m = HashMap(151, hash_function_2)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    for i in range(200, 300, 14):
+        m.remove(str(i))
+    result = True
+    for i in range(200, 300, 7):
+        expected = None if (i - 200) % 14 == 0 else i * 10
+        result &= m.get(str(i)) == expected
+    print(m.get_size(), m.get_capacity(), m.empty_buckets(), result)
+
+    print("\nget_keys_and_values example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    print("\n__iter__(), __next__() example 1")
+    print("--------------------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
@@ -3,32 +3,224 @@
 # Description: Implementation of a HashMap class making use of a dynamic array to store a hash
 #              table with chaining for collision resolution using a single linked list.
 #              Class includes methods: put, get, remove, contains_key, clear, empty_buckets,
-#              resize_table, table_load, get_keys_and_values, and an additional separate find_mode method.
+#              resize_table, table_load, get_keys_and_values, pop, setdefault, update, increment,
+#              __iter__, keys, values, items, dump, load, and an additional separate find_mode method.
+#              ModeCounter counts values from a stream and keeps their mode(s) up to date.
+#              A chain that grows past a few nodes is promoted to a NestedChain, which spreads
+#              its nodes by a second, seeded hash so colliding keys such as anagrams under
+#              hash_function_1 don't turn lookups into a scan. With flood_guard, a chain that
+#              grows far longer than chance allows switches the map to a keyed hash with a
+#              random seed of its own and rehashes every key. LinkedChainHashMap never
+#              promotes its chains, as a baseline for both.
 
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+import copyreg
+import heapq
+import operator
+import os
+import time
+
+from a6_include import (DynamicArray, HashMapIterator, HashMapStats, ItemsView, KeyedHash,
+                        KeysView, LinkedList, MixedHash, SLNode, ValuesView, get_hash_function,
+                        dump_map, hash_blake2b, hash_function_1, hash_function_2, hash_keys,
+                        load_map, pack_ints, unpack_ints)
+
+
+# value of a node _entry() has just inserted for merge(), before the merged value is set
+_MISSING = object()
+
+# stand-in for every chain that has never held a node, so tables are filled in one slice
+# assignment; readers treat it as an empty chain and _chain() replaces it before an insert
+_EMPTY_CHAIN = LinkedList()
+
+# seed of the second hash NestedChain spreads nodes by, drawn once per process
+_NESTED_SEED = int.from_bytes(os.urandom(8), 'little')
+
+
+def _nested_hash(key) -> int:
+    """
+    Second hash of a key, seeded independently of the map's hash function, so keys whose
+    full hashes are equal still spread out. Keys hash() rejects fall back to keyed BLAKE2b.
+    :param key: key to hash
+    :return: hash value
+    """
+    try:
+        return hash((_NESTED_SEED, key))
+    except TypeError:
+        return hash_blake2b(key)
+
+
+class NestedChain:
+    """
+    Chain for a bucket whose keys collide, often on their full hash (anagrams under
+    hash_function_1). Nodes are spread over a small power of two table of linked lists
+    by _nested_hash(), so a lookup walks one short list instead of the whole chain.
+    Supported methods are the LinkedList ones: insert, link, remove, pop, contains,
+    search, length, iterator
+    """
+
+    __slots__ = ('_lists', '_size')
+
+    def __init__(self, nodes=(), capacity: int = 16) -> None:
+        """
+        Initialize new nested chain of capacity lists, relinking the given nodes into it.
+        nodes may be a LinkedList being promoted; it must not be used afterwards.
+        """
+        self._lists = DynamicArray()
+        self._lists.fill(_EMPTY_CHAIN, capacity)
+        self._size = 0
+        for node in nodes:
+            self.link(node)
+
+    def __str__(self) -> str:
+        """Override string method to provide output in the same form as LinkedList."""
+        return 'SLL [' + ' -> '.join(str(node) for node in self) + ']'
+
+    def __iter__(self):
+        """Return an iterator over the nodes, one list at a time."""
+        lists = self._lists
+        return (node for i in range(lists.length()) for node in lists.get_at_index(i))
+
+    def insert(self, key: str, value: object, hash: int = None) -> SLNode:
+        """Insert new node and return it."""
+        return self.link(SLNode(key, value, None, hash))
+
+    def link(self, node: SLNode) -> SLNode:
+        """
+        Insert an existing node, relinking it, and return it. The table doubles when
+        the nodes outnumber its lists.
+        """
+        if self._size >= self._lists.length():
+            self._grow()
+        self._size += 1
+        return self._list(node.key, True).link(node)
+
+    def remove(self, key: str, hash: int = None) -> bool:
+        """Remove node with matching key. Return True if removal was successful."""
+        if self._list(key).remove(key, hash):
+            self._size -= 1
+            return True
+        return False
+
+    def pop(self, key: str, hash: int = None) -> tuple:
+        """Unlink node with matching key. Return a tuple of (node or None, nodes visited)."""
+        node, visited = self._list(key).pop(key, hash)
+        if node is not None:
+            self._size -= 1
+        return node, visited
+
+    def search(self, key: str, hash: int = None) -> tuple:
+        """Return a tuple of (node with matching key or None, number of nodes visited)."""
+        return self._list(key).search(key, hash)
+
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """Return node with matching key, or None if no match."""
+        return self._list(key).contains(key, hash)
+
+    def length(self) -> int:
+        """Return the number of nodes."""
+        return self._size
+
+    def _list(self, key: str, insert: bool = False) -> LinkedList:
+        """
+        Return the list key belongs to; for an insert, the shared empty chain is
+        replaced with a list of its own.
+        """
+        lists = self._lists
+        index = _nested_hash(key) & (lists.length() - 1)
+        linked_list = lists.get_at_index(index)
+        if insert and linked_list is _EMPTY_CHAIN:
+            linked_list = LinkedList()
+            lists.set_at_index(index, linked_list)
+        return linked_list
+
+    def _grow(self) -> None:
+        """Double the table, relinking every node into the new lists."""
+        old_lists = self._lists
+        self._lists = DynamicArray()
+        self._lists.fill(_EMPTY_CHAIN, 2 * old_lists.length())
+        for i in range(old_lists.length()):
+            for node in old_lists.get_at_index(i):
+                self._list(node.key, True).link(node)
 
 
 class HashMap:
+    # number of old chains migrated by each operation during an incremental resize
+    _MIGRATE_STEP = 4
+
+    # a chain this long is promoted to a NestedChain before its next insert, and a
+    # NestedChain that removals leave this short is demoted back to a LinkedList
+    _PROMOTE_LENGTH = 8
+    _DEMOTE_LENGTH = 4
+
+    # in shrink mode, a removal that leaves the load below this halves the table
+    _SHRINK_LOAD = 0.125
+
+    # in flood_guard mode, an insert that leaves a chain longer than this reseeds the map;
+    # a good hash function keeps chains under 10 nodes even for millions of keys
+    _FLOOD_LENGTH = 32
+
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 incremental: bool = False,
+                 stats: bool = False,
+                 power_of_two: bool = False,
+                 shrink: bool = False,
+                 flood_guard: bool = False) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        function may be a hash function or the name of one registered in
+        a6_include.HASH_FUNCTIONS
+        If incremental is True, growth triggered by put() keeps the old and new
+        tables side by side and migrates a few chains per operation instead
+        of rebuilding the whole table inside a single insert
+        If stats is True, chain traversals and resizes are recorded, see get_stats()
+        If power_of_two is True, capacity is a power of two instead of a prime:
+        hashes are mixed before indexing with a bitmask, and doubling the table
+        splits every chain between its own index and index + old capacity
+        If shrink is True, the table halves whenever removals leave its load below
+        1/8, and clear() returns it to its initial capacity, never going lower
+        If flood_guard is True, an insert that leaves a chain longer than
+        _FLOOD_LENGTH nodes, the sign of keys chosen to collide, switches the map to
+        a KeyedHash with a random seed and rehashes every key; the limit doubles after
+        each reseed. A KeyedHash can also be passed as function from the start
         """
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
-
-        self._hash_function = function
+        # capacity must be a prime number, or a power of two in power_of_two mode
+        self._power_of_two = power_of_two
+        if power_of_two:
+            self._capacity = self._next_power_of_two(capacity)
+        else:
+            self._capacity = self._next_prime(capacity)
+        self._buckets.fill(_EMPTY_CHAIN, self._capacity)
+        self._shrink = shrink
+        self._min_capacity = self._capacity
+
+        # nodes visited by the current operation, and opt-in statistics
+        self._traversed = 0
+        self._stats = HashMapStats() if stats else None
+
+        self._hash_function = get_hash_function(function)
+        if power_of_two:
+            self._hash_function = MixedHash(self._hash_function)
         self._size = 0
 
+        # chain length that triggers a reseed, None without flood_guard
+        self._flood_limit = self._FLOOD_LENGTH if flood_guard else None
+        self._reseeds = 0
+
+        # structural modifications, checked by iterators
+        self._mod_count = 0
+
+        # state of an in-progress incremental resize
+        self._incremental = incremental
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -72,6 +264,13 @@ class HashMap:
 
         return True
 
+    @staticmethod
+    def _next_power_of_two(capacity: int) -> int:
+        """
+        Return the smallest power of two greater than or equal to capacity, at least 2
+        """
+        return 1 << max(capacity - 1, 1).bit_length()
+
     def get_size(self) -> int:
         """
         Return size of map
@@ -86,6 +285,84 @@ class HashMap:
         """
         return self._capacity
 
+    def get_reseeds(self) -> int:
+        """
+        Return number of times flood_guard has reseeded the hash function
+        """
+        return self._reseeds
+
+    def get_stats(self) -> dict:
+        """
+        Return recorded statistics and current table state as a dict,
+        or None if the map was created without stats
+        """
+        if self._stats is None:
+            return None
+        stats = self._stats.as_dict()
+        stats.update(size=self._size, capacity=self._capacity, load=self.table_load())
+        return stats
+
+    def __reduce_ex__(self, protocol: int) -> tuple:
+        """
+        Pickle the chains' layout instead of the node objects: bucket indices and
+        cached hashes are packed into 64-bit arrays, sent out-of-band under protocol 5,
+        and keys and values into lists, so loading links each node straight into its
+        chain in its original order
+        """
+        self._finish_migration()
+        indices, hashes, keys, values = [], [], [], []
+        for i in range(self._capacity):
+            for node in self._buckets.get_at_index(i):
+                indices.append(i)
+                hashes.append(node.hash)
+                keys.append(node.key)
+                values.append(node.value)
+
+        function = self._hash_function.function if self._power_of_two else self._hash_function
+        state = {
+            'capacity': self._capacity,
+            'function': function,
+            'options': {'incremental': self._incremental,
+                        'power_of_two': self._power_of_two,
+                        'shrink': self._shrink,
+                        'flood_guard': self._flood_limit is not None},
+            'min_capacity': self._min_capacity,
+            'flood_limit': self._flood_limit,
+            'reseeds': self._reseeds,
+            'stats': self._stats,
+            'indices': pack_ints(indices, protocol),
+            'hashes': pack_ints(hashes, protocol),
+            'keys': keys,
+            'values': values,
+        }
+        return copyreg.__newobj__, (type(self),), state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore a pickled table. If the hash function still gives the stored hash
+        of a key, nodes are linked straight into their chains; otherwise (a seeded
+        hash function in another process) every key is rehashed and put
+        """
+        self.__init__(state['capacity'], state['function'], **state['options'])
+        # a reseeded map keeps its raised limit, so loading doesn't trigger another reseed
+        self._flood_limit = state['flood_limit']
+        self._reseeds = state['reseeds']
+        indices = unpack_ints(state['indices'])
+        hashes = unpack_ints(state['hashes'])
+        keys, values = state['keys'], state['values']
+
+        if keys and self._hash_function(keys[0]) != hashes[0]:
+            for key, value in zip(keys, values):
+                self._put(key, value, self._hash_function(key))
+        else:
+            # inserting at the head, so walk backwards to keep each chain's order
+            for i in range(len(keys) - 1, -1, -1):
+                self._chain(self._buckets, indices[i]).insert(keys[i], values[i], hashes[i])
+            self._size = len(keys)
+
+        self._min_capacity = state['min_capacity']
+        self._stats = state['stats']
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
@@ -96,21 +373,19 @@ class HashMap:
         :return: none
         """
 
-        # check if load factor is >= to 1.0, resize double if needed
-        if self.table_load() >= 1.0:
-            self.resize_table(self._capacity * 2)
+        self._put(key, value, self._hash_function(key))
 
-        # find index for key/value pair to be put, index = hash % array_size
-        index = self._hash_function(key) % self._capacity
-        linked_list = self._buckets[index]
 
-        # check if key exists in linked list; replace or add
-        node = linked_list.contains(key)
-        if node:
-            node.value = value
-        else:
-            linked_list.insert(key, value)
-            self._size += 1
+    def _put(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Puts a key/value pair whose hash is already known.
+        :param key: key to be added
+        :param value: value to be added
+        :param key_hash: full hash of key
+        :return: none
+        """
+
+        self._entry(key, key_hash, value, 'put').value = value
 
 
     def empty_buckets(self) -> int:
@@ -120,6 +395,9 @@ class HashMap:
         :return: integer values of number of empty buckets
         """
 
+        # only the new table counts once any pending migration is done
+        self._finish_migration()
+
         # initialize count of empty buckets to return
         count = 0
 
@@ -143,16 +421,20 @@ class HashMap:
 
     def clear(self) -> None:
         """
-        Clears contents of the hash map without changing underlying hash table capacity.
+        Clears contents of the hash map without changing underlying hash table capacity,
+        reusing the table's storage. In shrink mode the table returns to its initial capacity.
         No parameters.
         :return: none
         """
 
-        # clear buckets, linked list, and size
-        self._buckets = DynamicArray()
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        # reset every bucket to the shared empty chain in one slice assignment
+        if self._shrink:
+            self._capacity = self._min_capacity
+        self._buckets.fill(_EMPTY_CHAIN, self._capacity)
         self._size = 0
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._mod_count += 1
 
 
     def resize_table(self, new_capacity: int) -> None:
@@ -166,28 +448,31 @@ class HashMap:
         if new_capacity < 1:
             return
 
-        # make sure new capacity is prime and load factor is less than 1
-        while not (self._is_prime(new_capacity) and (self._size / new_capacity <= 1)):
-            if not self._is_prime(new_capacity):
-                new_capacity = self._next_prime(new_capacity)
-            if not self._size / new_capacity <= 1:
-                new_capacity *= 2
+        # an explicit resize completes any pending incremental one first
+        self._finish_migration()
+        start = time.perf_counter() if self._stats is not None else 0
+
+        new_capacity = self._fit_capacity(new_capacity)
 
-        # create new dynamic array of linked lists with new capacity
+        # create new table, chains are created as nodes arrive
         new_buckets = DynamicArray()
-        for _ in range(new_capacity):
-            new_buckets.append(LinkedList())
+        new_buckets.fill(_EMPTY_CHAIN, new_capacity)
 
-        # rehash all key/value pairs in hash map to new buckets
+        # relink every node into new buckets using its cached hash, the chain iterator has
+        # already stepped past a node when it moves, and the old table is dropped after
+        # when a power of two table doubles, chain i splits between i and i + capacity
         for i in range(self._capacity):
             for node in self._buckets[i]:
-                new_index = self._hash_function(node.key) % new_capacity
-                new_linked_list = new_buckets[new_index]
-                new_linked_list.insert(node.key, node.value)
+                new_index = self._home(node.hash, new_capacity)
+                self._chain(new_buckets, new_index).link(node)
 
         # update capacity and buckets after resized
         self._capacity = new_capacity
         self._buckets = new_buckets
+        self._mod_count += 1
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
 
 
     def get(self, key: str):
@@ -198,10 +483,13 @@ class HashMap:
         :return: value at key
         """
 
+        if self._old_buckets is not None:
+            self._migrate(self._MIGRATE_STEP)
+
         # find index for key/value pair
-        index = self._hash_function(key) % self._capacity
-        linked_list = self._buckets[index]
-        node = linked_list.contains(key)
+        node = self._lookup(key, self._hash_function(key))
+        if self._stats is not None:
+            self._stats.record('get', self._traversed)
         if node:
             return node.value
 
@@ -216,15 +504,38 @@ class HashMap:
         :return: bool value, True if exists otherwise False
         """
 
+        if self._old_buckets is not None:
+            self._migrate(self._MIGRATE_STEP)
+
         # checks if key in is hash map, else returns False
         # empty hash map does not contain any keys
-        index = self._hash_function(key) % self._capacity
-        linked_list = self._buckets[index]
-        if not linked_list.contains(key):
+        node = self._lookup(key, self._hash_function(key))
+        if self._stats is not None:
+            self._stats.record('contains_key', self._traversed)
+        if not node:
             return False
         return True
 
 
+    def _access(self, key: str, key_hash: int, operation: str) -> SLNode:
+        """
+        Finds a key whose hash is already known, as get() and contains_key() do, for callers
+        such as ShardedHashMap that hash keys themselves.
+        :param key: key to find
+        :param key_hash: full hash of key
+        :param operation: 'get' or 'contains_key', recorded in stats
+        :return: SLNode of key, or None if key doesn't exist
+        """
+
+        if self._old_buckets is not None:
+            self._migrate(self._MIGRATE_STEP)
+
+        node = self._lookup(key, key_hash)
+        if self._stats is not None:
+            self._stats.record(operation, self._traversed)
+        return node
+
+
     def remove(self, key: str) -> None:
         """
         Removes given key and value from hash map.  O(1) average time complexity.
@@ -232,14 +543,100 @@ class HashMap:
         :return: none
         """
 
-        # find index of key/value pair and remove
+        self._remove(key, self._hash_function(key))
+
+
+    def _remove(self, key: str, key_hash: int) -> SLNode:
+        """
+        Removes a key whose hash is already known, walking its chain once.
+        :param key: key for key/value pair to be removed
+        :param key_hash: full hash of key
+        :return: removed SLNode, or None if key wasn't in the hash map
+        """
+
+        if self._old_buckets is not None:
+            self._migrate(self._MIGRATE_STEP)
+
+        # unlink from the new chain, or from an unmigrated old chain
         # if key not in hash map, method does nothing
-        index = self._hash_function(key) % self._capacity
+        self._traversed = 0
+        index = self._home(key_hash, self._capacity)
         linked_list = self._buckets[index]
-        if self.contains_key(key):
-            linked_list.remove(key)
+        node, visited = linked_list.pop(key, key_hash)
+        self._traversed += visited
+        if node is not None and linked_list.length() <= self._DEMOTE_LENGTH \
+                and type(linked_list) is NestedChain:
+            self._demote(index)
+        if node is None:
+            old_list = self._old_chain(key_hash)
+            if old_list is not None:
+                node, visited = old_list.pop(key, key_hash)
+                self._traversed += visited
+
+        if node is not None:
             self._size -= 1
-        return
+            self._mod_count += 1
+        if self._stats is not None:
+            self._stats.record('remove', self._traversed)
+        if node is not None and self._shrink:
+            self._shrink_if_sparse()
+        return node
+
+
+    def pop(self, key: str, default: object = None) -> object:
+        """
+        Removes given key and returns its value, hashing the key and walking its chain once.
+        O(1) average time complexity.
+        :param key: key for key/value pair to be removed
+        :param default: value returned if key doesn't exist
+        :return: removed value, or default
+        """
+
+        node = self._remove(key, self._hash_function(key))
+        if node is None:
+            return default
+        return node.value
+
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Gets value associated with given key, first putting key with default if it doesn't exist.
+        Hashes the key and walks its chain once. O(1) average time complexity.
+        :param key: key to get value from
+        :param default: value put if key doesn't exist
+        :return: value at key
+        """
+
+        return self._entry(key, self._hash_function(key), default, 'put').value
+
+
+    def update(self, key: str, function: callable, default: object = None) -> object:
+        """
+        Replaces value at key with function(value), where value is default if key doesn't exist.
+        Hashes the key and walks its chain once. O(1) average time complexity.
+        :param key: key to be updated
+        :param function: function of the current value returning the new value
+        :param default: current value used if key doesn't exist
+        :return: new value at key
+        """
+
+        node = self._entry(key, self._hash_function(key), default, 'put')
+        node.value = function(node.value)
+        return node.value
+
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the count at key, starting from 0 if key doesn't exist.
+        Hashes the key and walks its chain once. O(1) average time complexity.
+        :param key: key to be counted
+        :param delta: amount added to the count
+        :return: new count at key
+        """
+
+        node = self._entry(key, self._hash_function(key), 0, 'put')
+        node.value += delta
+        return node.value
 
 
     def get_keys_and_values(self) -> DynamicArray:
@@ -250,6 +647,8 @@ class HashMap:
         :return: Dynamic Array with tuples
         """
 
+        self._finish_migration()
+
         # initialize dynamic array, order of the keys does not matter
         keys_values = DynamicArray()
 
@@ -260,42 +659,619 @@ class HashMap:
         return keys_values
 
 
+    def merge(self, other, combine: callable = None) -> None:
+        """
+        Puts every key/value pair of another HashMap into this one. The table is resized at
+        most once, up front, for the combined size, and when both maps hash keys the same way
+        the other map's cached hashes are reused instead of rehashing.
+        O(N) average time complexity.
+        :param other: hash_map_oa or hash_map_sc HashMap to merge in
+        :param combine: function of (value here, value in other) giving the value of a key
+                        found in both maps; None keeps the other map's value
+        :return: none
+        """
+
+        self._finish_migration()
+        function = self._hash_function
+        same_hash = self._hash_identity() == other._hash_identity()
+
+        # size the table once so no put in the merge reaches a load factor of 1
+        needed = self._size + other.get_size()
+        if needed > self._capacity:
+            self.resize_table(needed)
+
+        # after a flood_guard reseed the other map's hashes no longer apply
+        for entry in other._entries():
+            if same_hash and self._hash_function is function:
+                key_hash = entry.hash
+            else:
+                key_hash = self._hash_function(entry.key)
+            self._merge_entry(entry.key, entry.value, key_hash, combine)
+
+
+    def put_many(self, keys, values) -> None:
+        """
+        Puts a batch of key/value pairs. The whole batch is hashed in one pass and the table
+        is resized at most once, up front. O(N) average time complexity.
+        :param keys: iterable or NumPy array of keys
+        :param values: iterable of values, one per key
+        :return: none
+        """
+
+        function = self._hash_function
+        keys, hashes = hash_keys(function, keys)
+
+        # size the table once so no put in the batch reaches a load factor of 1
+        needed = self._size + len(keys)
+        if needed > self._capacity:
+            self.resize_table(needed)
+
+        # after a flood_guard reseed the rest of the batch is hashed again
+        for key, value, key_hash in zip(keys, values, hashes):
+            if self._hash_function is not function:
+                key_hash = self._hash_function(key)
+            self._put(key, value, key_hash)
+
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Gets the values of a batch of keys, hashed in one pass. O(N) average time complexity.
+        :param keys: iterable or NumPy array of keys
+        :return: dynamic array of values in key order, None for missing keys
+        """
+
+        keys, hashes = hash_keys(self._hash_function, keys)
+        self._finish_migration()
+
+        values = []
+        for key, key_hash in zip(keys, hashes):
+            node = self._lookup(key, key_hash)
+            if self._stats is not None:
+                self._stats.record('get', self._traversed)
+            values.append(node.value if node else None)
+        return DynamicArray(values)
+
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes a batch of keys, hashed in one pass. O(N) average time complexity.
+        :param keys: iterable or NumPy array of keys
+        :return: none
+        """
+
+        keys, hashes = hash_keys(self._hash_function, keys)
+        self._finish_migration()
+
+        for key, key_hash in zip(keys, hashes):
+            self._remove(key, key_hash)
+
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Creates an independent iterator across the hash map's nodes. Each call returns a new
+        iterator, so loops can be nested, and it raises RuntimeError if the map is modified
+        during iteration.
+        :return: iterator of SLNode objects
+        """
+
+        return HashMapIterator(self, self._entries())
+
+
+    def keys(self) -> KeysView:
+        """
+        Creates a lazy view of the keys that walks the chains without copying them.
+        :return: KeysView of the hash map
+        """
+
+        return KeysView(self)
+
+
+    def values(self) -> ValuesView:
+        """
+        Creates a lazy view of the values that walks the chains without copying them.
+        :return: ValuesView of the hash map
+        """
+
+        return ValuesView(self)
+
+
+    def items(self) -> ItemsView:
+        """
+        Creates a lazy view of the (key, value) pairs that walks the chains without copying them.
+        :return: ItemsView of the hash map
+        """
+
+        return ItemsView(self)
+
+    def dump(self, file) -> None:
+        """
+        Writes the hash map to a binary file object as a pickle protocol 5 stream followed by
+        the packed bucket layout as raw bytes, see a6_include.dump_map().
+        :param file: file object opened for binary writing
+        :return: none
+        """
+
+        dump_map(self, file)
+
+
+    @classmethod
+    def load(cls, file) -> "HashMap":
+        """
+        Reads a hash map written by dump().
+        :param file: file object opened for binary reading
+        :return: loaded hash map
+        """
+
+        hash_map = load_map(file)
+        if not isinstance(hash_map, cls):
+            raise ValueError(f"dump holds a {type(hash_map).__name__}, not a {cls.__name__}")
+        return hash_map
+
+    # ------------------------------------------------------------------ #
+
+    def _home(self, key_hash: int, capacity: int) -> int:
+        """
+        Finds the bucket a hash belongs to.
+        :param key_hash: cached full hash
+        :param capacity: capacity of the table
+        :return: bucket index, hash % capacity, or a bitmask in power_of_two mode
+        """
+
+        if self._power_of_two:
+            return key_hash & (capacity - 1)
+        return key_hash % capacity
+
+
+    def _fit_capacity(self, new_capacity: int) -> int:
+        """
+        Grows a requested capacity until it is prime (or a power of two in power_of_two mode)
+        and keeps the load factor at or below 1.
+        :param new_capacity: requested capacity
+        :return: usable capacity
+        """
+
+        if self._power_of_two:
+            new_capacity = self._next_power_of_two(new_capacity)
+            while self._size / new_capacity > 1:
+                new_capacity *= 2
+            return new_capacity
+
+        # make sure new capacity is prime and load factor is less than 1
+        while not (self._is_prime(new_capacity) and (self._size / new_capacity <= 1)):
+            if not self._is_prime(new_capacity):
+                new_capacity = self._next_prime(new_capacity)
+            if not self._size / new_capacity <= 1:
+                new_capacity *= 2
+        return new_capacity
+
+
+    def _entry(self, key: str, key_hash: int, default: object, operation: str) -> SLNode:
+        """
+        Finds the node for a key whose hash is already known, inserting the key with default
+        as its value if it is missing. Resizes table if needed and walks the key's chain once.
+        :param key: key to look for
+        :param key_hash: full hash of key
+        :param default: value of a newly inserted node
+        :param operation: operation name recorded in statistics
+        :return: SLNode holding key
+        """
+
+        # move a few chains of an in-progress incremental resize
+        if self._old_buckets is not None:
+            self._migrate(self._MIGRATE_STEP)
+
+        # check if load factor is >= to 1.0, resize double if needed
+        if self.table_load() >= 1.0:
+            if self._incremental:
+                self._start_migration(self._capacity * 2)
+            else:
+                self.resize_table(self._capacity * 2)
+
+        self._traversed = 0
+
+        # a key still waiting in an unmigrated old chain is used in place
+        old_list = self._old_chain(key_hash)
+        if old_list is not None:
+            node = self._search(old_list, key, key_hash)
+            if node:
+                if self._stats is not None:
+                    self._stats.record(operation, self._traversed)
+                return node
+
+        # find index for key/value pair, index = hash % array_size
+        index = self._home(key_hash, self._capacity)
+        linked_list = self._buckets[index]
+
+        # check if key exists in linked list, else add it
+        node = self._search(linked_list, key, key_hash)
+        if not node:
+            linked_list = self._chain(self._buckets, index)
+            node = linked_list.insert(key, default, key_hash)
+            self._size += 1
+            self._mod_count += 1
+
+        if self._stats is not None:
+            self._stats.record(operation, self._traversed)
+            self._stats.record_chain(linked_list.length())
+        if self._flood_limit is not None and linked_list.length() > self._flood_limit:
+            self._reseed()
+        return node
+
+
+    def _chain(self, buckets: DynamicArray, index: int) -> LinkedList:
+        """
+        Finds the chain at index for an insert, replacing the shared empty chain with a
+        chain of its own, and a linked list of _PROMOTE_LENGTH nodes with a NestedChain.
+        :param buckets: table holding the chain
+        :param index: bucket index
+        :return: linked list or NestedChain that may be inserted into
+        """
+
+        linked_list = buckets[index]
+        if linked_list is _EMPTY_CHAIN:
+            linked_list = LinkedList()
+            buckets[index] = linked_list
+        elif linked_list.length() >= self._PROMOTE_LENGTH and type(linked_list) is LinkedList:
+            linked_list = NestedChain(linked_list)
+            buckets[index] = linked_list
+        return linked_list
+
+
+    def _demote(self, index: int) -> None:
+        """
+        Turns the NestedChain at index back into a linked list, relinking its nodes.
+        :param index: bucket index in the current table
+        :return: none
+        """
+
+        linked_list = LinkedList()
+        for node in self._buckets[index]:
+            linked_list.link(node)
+        self._buckets[index] = linked_list
+
+
+    def _reseed(self) -> None:
+        """
+        Switches to a KeyedHash with a fresh random seed after an insert made a chain longer
+        than the flood limit, and doubles the limit. Every node's cached hash is replaced and
+        the nodes are relinked into a table of the same capacity.
+        :return: none
+        """
+
+        self._finish_migration()
+        function = KeyedHash()
+        self._hash_function = MixedHash(function) if self._power_of_two else function
+        for node in self._entries():
+            node.hash = self._hash_function(node.key)
+        self.resize_table(self._capacity)
+        self._flood_limit *= 2
+        self._reseeds += 1
+
+
+    def _shrink_if_sparse(self) -> None:
+        """
+        Halves the table after a removal leaves its load below _SHRINK_LOAD, down to the
+        initial capacity, so a drained map releases its chains.
+        :return: none
+        """
+
+        if self._size >= self._capacity * self._SHRINK_LOAD or self._capacity <= self._min_capacity:
+            return
+
+        new_capacity = max(self._capacity // 2, self._min_capacity)
+        if self._incremental:
+            self._start_migration(new_capacity)
+        else:
+            self.resize_table(new_capacity)
+
+
+    def _old_chain(self, key_hash: int) -> LinkedList:
+        """
+        Finds the old chain a hash belongs to if it hasn't been migrated yet.
+        :param key_hash: cached full hash of a key
+        :return: unmigrated old linked list, or None
+        """
+
+        if self._old_buckets is None:
+            return None
+        old_index = self._home(key_hash, self._old_capacity)
+        if old_index < self._migrate_index:
+            return None
+        return self._old_buckets[old_index]
+
+
+    def _lookup(self, key: str, key_hash: int):
+        """
+        Finds the node for key, consulting the old table during an incremental resize.
+        :param key: key to look for
+        :param key_hash: full hash of key
+        :return: matching SLNode, or None if key isn't in the hash map
+        """
+
+        self._traversed = 0
+        node = self._search(self._buckets[self._home(key_hash, self._capacity)], key, key_hash)
+        if node is None:
+            old_list = self._old_chain(key_hash)
+            if old_list is not None:
+                node = self._search(old_list, key, key_hash)
+        return node
+
+
+    def _search(self, linked_list: LinkedList, key: str, key_hash: int):
+        """
+        Finds key in one chain. With stats enabled the nodes visited are added to
+        self._traversed.
+        :param linked_list: chain to search
+        :param key: key to look for
+        :param key_hash: full hash of key
+        :return: matching SLNode, or None if key isn't in the chain
+        """
+
+        if self._stats is None:
+            return linked_list.contains(key, key_hash)
+        node, visited = linked_list.search(key, key_hash)
+        self._traversed += visited
+        return node
+
+
+    def _start_migration(self, new_capacity: int) -> None:
+        """
+        Begins an incremental resize: allocates the new table and keeps the current one as
+        the old table to be drained by later operations.
+        :param new_capacity: requested capacity of the new table
+        :return: none
+        """
+
+        # at most two tables coexist, so finish an earlier migration first
+        self._finish_migration()
+        start = time.perf_counter() if self._stats is not None else 0
+
+        new_capacity = self._fit_capacity(new_capacity)
+        new_buckets = DynamicArray()
+        new_buckets.fill(_EMPTY_CHAIN, new_capacity)
+
+        self._old_buckets, self._old_capacity = self._buckets, self._capacity
+        self._migrate_index = 0
+        self._buckets, self._capacity = new_buckets, new_capacity
+        self._mod_count += 1
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+
+    def _migrate(self, count: int) -> None:
+        """
+        Moves up to count old chains into the new table.
+        :param count: number of old chains to migrate
+        :return: none
+        """
+
+        start = time.perf_counter() if self._stats is not None else 0
+        stop = min(self._migrate_index + count, self._old_capacity)
+        for i in range(self._migrate_index, stop):
+            # nodes are relinked, migrated old chains are never read again
+            for node in self._old_buckets[i]:
+                self._chain(self._buckets, self._home(node.hash, self._capacity)).link(node)
+
+        # drop the old table once every chain has moved
+        self._migrate_index = stop
+        if stop == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start, new=False)
+
+
+    def _merge_entry(self, key: str, value: object, key_hash: int, combine: callable) -> None:
+        """
+        Puts a key/value pair whose hash is already known, combining it with the value of a
+        key that is already present. The key's chain is walked once.
+        :param key: key to be added
+        :param value: value to be added
+        :param key_hash: full hash of key
+        :param combine: function of (current value, value) giving the new value, or None
+        :return: none
+        """
+
+        node = self._entry(key, key_hash, _MISSING, 'put')
+        if combine is None or node.value is _MISSING:
+            node.value = value
+        else:
+            node.value = combine(node.value, value)
+
+
+    def _hash_identity(self) -> tuple:
+        """
+        Identifies how the map hashes keys, so maps with equal identities store equal hashes.
+        :return: tuple of (hash function before mixing, power_of_two)
+        """
+
+        if self._power_of_two:
+            return self._hash_function.function, True
+        return self._hash_function, False
+
+
+    def _entries(self):
+        """
+        Starts a walk over every node, reading the chains in place.
+        An in-progress incremental resize is completed first so that no node moves
+        under the walk.
+        :return: generator of SLNode objects
+        """
+
+        self._finish_migration()
+        buckets = self._buckets
+        return (node for i in range(buckets.length()) for node in buckets.get_at_index(i))
+
+
+    def _finish_migration(self) -> None:
+        """
+        Completes any in-progress incremental resize.
+        :return: none
+        """
+
+        if self._old_buckets is not None:
+            self._migrate(self._old_capacity)
+
+
+class LinkedChainHashMap(HashMap):
+    """
+    HashMap whose chains are never promoted to NestedChains, so colliding keys stay in one
+    linked list; the baseline that NestedChain and flood_guard are measured against.
+    """
+    _PROMOTE_LENGTH = float('inf')
+
+
+class ModeCounter:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 **options) -> None:
+        """
+        Initialize new ModeCounter counting values in a separate chaining HashMap
+        built from capacity, function and options
+        """
+        self._counts = HashMap(capacity, function, **options)
+        self._modes = DynamicArray()
+        self._mode_freq = 0
+        self._total = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        return str(self._counts)
+
+    def get_size(self) -> int:
+        """
+        Return number of distinct values counted
+        """
+        return self._counts.get_size()
+
+    def get_total(self) -> int:
+        """
+        Return number of values counted, repeats included
+        """
+        return self._total
+
+    def get_mode_frequency(self) -> int:
+        """
+        Return highest frequency of any value, 0 if nothing has been counted
+        """
+        return self._mode_freq
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: object, count: int = 1) -> int:
+        """
+        Counts value count more times and updates the mode(s). Counts only grow, so a
+        value whose new count passes the mode frequency replaces the modes, and one that
+        reaches it joins them. O(1) average time complexity.
+        :param value: value to count
+        :param count: number of occurrences, at least 1
+        :return: new count of value
+        """
+
+        if count < 1:
+            raise ValueError("count must be at least 1")
+
+        freq = self._counts.increment(value, count)
+        self._total += count
+        if freq > self._mode_freq:
+            self._mode_freq = freq
+            self._modes = DynamicArray()
+            self._modes.append(value)
+        elif freq == self._mode_freq:
+            self._modes.append(value)
+        return freq
+
+
+    def update(self, iterable) -> None:
+        """
+        Counts every value of an iterable, reading it lazily so a generator over a stream
+        is never held in memory. O(N) average time complexity.
+        :param iterable: iterable or generator of values
+        :return: none
+        """
+
+        for value in iterable:
+            self.add(value)
+
+
+    def get_count(self, value: object) -> int:
+        """
+        Gets number of times value was counted. O(1) average time complexity.
+        :param value: value to look up
+        :return: count of value, 0 if never seen
+        """
+
+        count = self._counts.get(value)
+        return 0 if count is None else count
+
+
+    def get_modes(self) -> DynamicArray:
+        """
+        Creates a dynamic array of the mode value(s), in the order they reached the mode
+        frequency. O(M) time complexity for M modes.
+        :return: Dynamic Array of mode values
+        """
+
+        modes = DynamicArray()
+        for i in range(self._modes.length()):
+            modes.append(self._modes.get_at_index(i))
+        return modes
+
+
+    def top_k(self, k: int) -> DynamicArray:
+        """
+        Finds the k most frequent values with a heap of size k, most frequent first.
+        O(N log k) time complexity for N distinct values.
+        :param k: number of values to return
+        :return: Dynamic Array of (value, count) tuples
+        """
+
+        top = DynamicArray()
+        for pair in heapq.nlargest(k, self._counts.items(), key=operator.itemgetter(1)):
+            top.append(pair)
+        return top
+
+
+    def merge(self, other: "ModeCounter") -> None:
+        """
+        Adds the counts of another ModeCounter, such as one filled by a parallel worker,
+        then recomputes the mode(s) in one pass over the merged counts.
+        O(N + M) average time complexity for N and M distinct values.
+        :param other: ModeCounter to merge in
+        :return: none
+        """
+
+        self._counts.merge(other._counts, operator.add)
+        self._total += other._total
+
+        self._modes = DynamicArray()
+        self._mode_freq = 0
+        for value, freq in self._counts.items():
+            if freq > self._mode_freq:
+                self._mode_freq = freq
+                self._modes = DynamicArray()
+            if freq == self._mode_freq:
+                self._modes.append(value)
+
+
 def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
     """
-    Finds mode value(s) and highest frequency of given dynamic array value(s).
-    O(N) average time complexity.
+    Finds mode value(s) and highest frequency of given dynamic array value(s) in a single
+    pass with a ModeCounter. O(N) average time complexity.
     :param da: dynamic array, unsorted or sorted
     :return: tuple containing dynamic array of mode value(s) and highest frequency integer for mode value(s)
     """
 
-    # create separate chaining HashMap to store mode frequencies
-    map = HashMap()
-
-    # find frequencies and find mode frequency
-    mode_freq = 0
-    for i in range(da.length()):
-        value = da.get_at_index(i)
-        if map.contains_key(value):
-            freq = map.get(value)
-            freq += 1
-            map.put(value, freq)
-        else:
-            map.put(value, 1)
-            freq = 1
-
-        if freq > mode_freq:
-            mode_freq = freq
-
-    # find mode values with the max mode frequency
-    mode_values = DynamicArray()
-    keys_freq = map.get_keys_and_values()
-    for i in range(keys_freq.length()):
-        key, freq = keys_freq.get_at_index(i)
-        if freq == mode_freq:
-            mode_values.append(key)
+    counter = ModeCounter()
+    counter.update(da.get_at_index(i) for i in range(da.length()))
 
     # return tuple with dynamic array of mode value(s), highest frequency integer
-    return mode_values, mode_freq
+    return counter.get_modes(), counter.get_mode_frequency()
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -498,3 +1474,134 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\npop / setdefault / update / increment example 1")
+    print("-------------------------------------------------")
+    m = HashMap(11, hash_function_1)
+    for word in 'the cat and the hat and the bat'.split():
+        m.increment(word)
+    print(m.get('the'), m.get('and'), m.increment('cat', 10), m.get_size())
+    print(m.setdefault('dog', []), m.setdefault('the', 0), m.get_size())
+    print(m.update('hat', lambda count: count * 5), m.update('cow', str, 'moo'))
+    print(m.pop('the'), m.pop('the'), m.pop('the', 'gone'), m.get_size())
+
+    print("\nkeys / values / items example 1")
+    print("-------------------------------")
+    m = HashMap(5, hash_function_1)
+    for i in range(4):
+        m.put('k' + str(i), i)
+    print(sorted(m.keys()), sorted(m.values()), sorted(m.items()))
+    print(len(m.items()), 'k2' in m.keys(), 'k9' in m.keys(), 3 in m.values(), ('k1', 1) in m.items())
+    pairs = [(a.key, b.key) for a in m for b in m]
+    print(len(pairs))
+    try:
+        for key in m.keys():
+            m.remove(key)
+    except RuntimeError as error:
+        print('RuntimeError:', error, m.get_size())
+
+    print("\nput_many / get_many / remove_many example 1")
+    print("-------------------------------------------")
+    m = HashMap(53, hash_function_2)
+    m.put_many(['key' + str(i) for i in range(500)], range(500))
+    print(m.get_size(), m.get_capacity())
+    m.remove_many('key' + str(i) for i in range(0, 500, 2))
+    values = m.get_many(['key1', 'key2', 'key499', 'missing'])
+    print(m.get_size(), values)
+
+    print("\nstats example 1")
+    print("---------------")
+    m = HashMap(53, hash_function_1, stats=True)
+    for i in range(300):
+        m.put('str' + str(i), i)
+    for i in range(0, 600, 3):
+        m.get('str' + str(i))
+    m.remove('str7')
+    stats = m.get_stats()
+    print(stats['operations'], stats['resizes'], stats['max_chain_length'])
+    print(stats['max_length'], round(stats['mean_lengths']['get'], 2), stats['histograms']['get'][:8])
+
+    print("\npower of two example 1")
+    print("----------------------")
+    m = HashMap(50, hash_function_1, power_of_two=True)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    m.resize_table(1000)
+    result = all(m.get('str' + str(i)) == i * 100 for i in range(150))
+    print(result, m.get_capacity(), m.contains_key('str150'))
+
+    print("\nincremental resize example 1")
+    print("----------------------------")
+    m = HashMap(53, hash_function_1, incremental=True)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    result = True
+    for i in range(0, 150, 2):
+        m.remove('str' + str(i))
+    for i in range(150):
+        expected = None if i % 2 == 0 else i * 100
+        result &= m.get('str' + str(i)) == expected
+    print(result, m.get_size(), m.get_keys_and_values().length())
+
+
+    print("\npickle / dump example 1")
+    print("-----------------------")
+    import io
+    import pickle
+    m = HashMap(11, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i), i * 10)
+    for i in range(0, 50, 5):
+        m.remove('str' + str(i))
+    buffers = []
+    data = pickle.dumps(m, protocol=5, buffer_callback=buffers.append)
+    copy = pickle.loads(data, buffers=buffers)
+    file = io.BytesIO()
+    m.dump(file)
+    file.seek(0)
+    loaded = HashMap.load(file)
+    for restored in (copy, loaded):
+        result = all(restored.get('str' + str(i)) == (None if i % 5 == 0 else i * 10)
+                     for i in range(50))
+        print(result, restored.get_size(), restored.get_capacity(), len(buffers))
+
+    print("\nModeCounter example 1")
+    print("---------------------")
+    counter = ModeCounter()
+    counter.update('word' + str(i % 7 * i % 11) for i in range(2000))
+    other = ModeCounter()
+    other.update(('word0', 'word3', 'word3'))
+    counter.merge(other)
+    print(counter.get_modes(), counter.get_mode_frequency(), counter.get_total(), counter.get_size())
+    print(counter.top_k(3), counter.get_count('word3'), counter.get_count('missing'))
+
+    print("\nshrink example 1")
+    print("----------------")
+    m = HashMap(11, 'fnv1a', shrink=True)
+    for i in range(1000):
+        m.put(i, i)
+    peak = m.get_capacity()
+    for i in range(990):
+        m.remove(i)
+    print(peak, m.get_capacity(), m.get_size(), m.get(995))
+    m.clear()
+    print(m.get_capacity(), m.get_size(), m.get(995))
+
+    print("\nflood guard example 1")
+    print("---------------------")
+    import itertools
+    keys = [''.join(p) for p in itertools.islice(itertools.permutations('SKU-4821'), 2000)]
+
+    # chains are never promoted to NestedChains, so only flood_guard stops the collisions
+    for guard in (False, True):
+        m = LinkedChainHashMap(11, hash_function_1, stats=True, flood_guard=guard)
+        for key in keys:
+            m.put(key, key)
+        result = all(m.get(key) == key for key in keys)
+        print(guard, result, m.get_size(), m.get_reseeds(), m.get_stats()['max_length'] < 100)
+    copy = pickle.loads(pickle.dumps(m))
+    print(copy.get_reseeds(), copy.get(keys[0]) == keys[0])
@@ -0,0 +1,276 @@
+# Name: Aubrey Floyd
+# Course: CS261 - Data Structures
+# Description: Implementation of a thread-safe ShardedHashMap that partitions keys across several
+#              independent separate chaining or open addressing HashMaps (shards), each guarded
+#              by its own lock. An operation locks only the shard its key belongs to, so resizes
+#              happen per shard and threads working on different shards never wait for each other.
+#              Class includes methods: put, get, remove, contains_key, clear, get_size,
+#              get_capacity, table_load, get_keys_and_values, and get_shard_sizes.
+
+import threading
+
+from a6_include import (DynamicArray, MixedHash, get_hash_function, hash_function_1,
+                        hash_function_2, mix_hash)
+import hash_map_oa
+import hash_map_sc
+
+
+def shard_index(key_hash: int, shard_count: int) -> int:
+    """
+    Picks a shard from the high bits of a mixed hash. Shards index their buckets with
+    the low bits of the same hash, so the two choices stay independent.
+    :param key_hash: hash of a key
+    :param shard_count: number of shards
+    :return: shard index
+    """
+    return (mix_hash(key_hash) * shard_count) >> 64
+
+
+def shard_hash(shard, function: callable, key_hash: int, key: str) -> int:
+    """
+    Turns the hash a key was sharded by into the hash shard indexes it with, reusing
+    key_hash when shard hashes with function, mixing it when shard wraps function in a
+    MixedHash (power_of_two), and hashing key again only when shard was reseeded.
+    :param shard: separate chaining or open addressing HashMap
+    :param function: hash function key_hash was computed with
+    :param key_hash: hash of key under function
+    :param key: key being placed
+    :return: hash of key under shard's hash function
+    """
+    shard_function = shard._hash_function
+    if shard_function == function:
+        return key_hash
+    if type(shard_function) is MixedHash and shard_function.function == function:
+        return mix_hash(key_hash)
+    return shard_function(key)
+
+
+class ShardedHashMap:
+    def __init__(self,
+                 shards: int = 16,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 map_class: type = hash_map_sc.HashMap,
+                 **options) -> None:
+        """
+        Initialize new ShardedHashMap of shards independent maps of map_class,
+        hash_map_sc.HashMap or hash_map_oa.HashMap, sharing capacity between them
+        function may be a hash function or the name of one registered in
+        a6_include.HASH_FUNCTIONS
+        options (incremental, stats, power_of_two) are passed to every shard
+        """
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+
+        self._hash_function = get_hash_function(function)
+        self._shard_count = shards
+
+        shard_capacity = max(1, -(-capacity // shards))
+        self._shards = [map_class(shard_capacity, self._hash_function, **options)
+                        for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i, shard in enumerate(self._shards):
+            with self._locks[i]:
+                out += 'shard ' + str(i) + ':\n' + str(shard)
+        return out
+
+    @classmethod
+    def from_shards(cls, shards: list, function: callable = hash_function_1) -> "ShardedHashMap":
+        """
+        Wrap already built maps as the shards of a ShardedHashMap. Every key must be in
+        the shard shard_index() picks for its hash under function, as in the maps
+        hash_map_parallel.build_parallel() builds
+        """
+        sharded = cls.__new__(cls)
+        sharded._hash_function = get_hash_function(function)
+        sharded._shard_count = len(shards)
+        sharded._shards = list(shards)
+        sharded._locks = [threading.Lock() for _ in shards]
+        return sharded
+
+    def get_shard_count(self) -> int:
+        """
+        Return number of shards
+        """
+        return self._shard_count
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates key/value pair in the key's shard, holding only that shard's lock.
+        O(1) average time complexity.
+        :param key: key to be added
+        :param value: value to be added
+        :return: none
+        """
+
+        key_hash = self._hash_function(key)
+        index = shard_index(key_hash, self._shard_count)
+        shard = self._shards[index]
+        with self._locks[index]:
+            shard._put(key, value, shard_hash(shard, self._hash_function, key_hash, key))
+
+
+    def get(self, key: str) -> object:
+        """
+        Gets value associated with given key, or None if key doesn't exist.
+        O(1) average time complexity.
+        :param key: key to get value from
+        :return: value at key
+        """
+
+        # reads lock too: a shard may resize or migrate during any operation
+        key_hash = self._hash_function(key)
+        index = shard_index(key_hash, self._shard_count)
+        shard = self._shards[index]
+        with self._locks[index]:
+            node = shard._access(key, shard_hash(shard, self._hash_function, key_hash, key), 'get')
+            return node.value if node is not None else None
+
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if given key is in hash map. O(1) average time complexity.
+        :param key: key to check for in hash map
+        :return: bool value, True if exists otherwise False
+        """
+
+        key_hash = self._hash_function(key)
+        index = shard_index(key_hash, self._shard_count)
+        shard = self._shards[index]
+        with self._locks[index]:
+            node = shard._access(key, shard_hash(shard, self._hash_function, key_hash, key),
+                                 'contains_key')
+            return node is not None
+
+
+    def remove(self, key: str) -> None:
+        """
+        Removes given key and value from hash map. O(1) average time complexity.
+        :param key: key for key/value pair to be removed
+        :return: none
+        """
+
+        key_hash = self._hash_function(key)
+        index = shard_index(key_hash, self._shard_count)
+        shard = self._shards[index]
+        with self._locks[index]:
+            shard._remove(key, shard_hash(shard, self._hash_function, key_hash, key))
+
+
+    def clear(self) -> None:
+        """
+        Clears every shard, one at a time.
+        :return: none
+        """
+
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                shard.clear()
+
+
+    def get_size(self) -> int:
+        """
+        Finds number of key/value pairs, summed shard by shard. Under concurrent writes the
+        total is not taken at a single instant.
+        :return: size of the hash map
+        """
+
+        return sum(self.get_shard_sizes())
+
+
+    def get_capacity(self) -> int:
+        """
+        Finds total capacity of all shards.
+        :return: sum of shard capacities
+        """
+
+        total = 0
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                total += shard.get_capacity()
+        return total
+
+
+    def table_load(self) -> float:
+        """
+        Finds the load factor across all shards.
+        :return: float value of load factor
+        """
+
+        return self.get_size() / self.get_capacity()
+
+
+    def get_shard_sizes(self) -> list:
+        """
+        Finds number of key/value pairs in each shard, showing how evenly keys are spread.
+        :return: list of shard sizes
+        """
+
+        sizes = []
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                sizes.append(shard.get_size())
+        return sizes
+
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a dynamic array of key/value tuples, copying one shard at a time.
+        :return: Dynamic Array with tuples
+        """
+
+        keys_values = DynamicArray()
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                shard_pairs = shard.get_keys_and_values()
+            for i in range(shard_pairs.length()):
+                keys_values.append(shard_pairs[i])
+        return keys_values
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get / remove example 1")
+    print("----------------------------")
+    m = ShardedHashMap(4, 53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+    for i in range(0, 150, 3):
+        m.remove('str' + str(i))
+    result = all(m.get('str' + str(i)) == (None if i % 3 == 0 else i * 100) for i in range(150))
+    print(result, m.get_size(), m.get_shard_sizes(), m.contains_key('str1'), m.contains_key('str0'))
+
+    print("\nopen addressing shards example 1")
+    print("--------------------------------")
+    m = ShardedHashMap(8, 100, hash_function_2, hash_map_oa.HashMap, power_of_two=True)
+    for i in range(500):
+        m.put(str(i), i)
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2), m.get(str(250)))
+
+    print("\nthreads example 1")
+    print("-----------------")
+    m = ShardedHashMap(8, 11, 'fnv1a')
+
+    def worker(start: int) -> None:
+        for i in range(start, start + 2000):
+            m.put(i, i * 2)
+        for i in range(start, start + 2000, 2):
+            m.remove(i)
+
+    threads = [threading.Thread(target=worker, args=(n * 2000,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result = all(m.get(i) == (None if i % 2 == 0 else i * 2) for i in range(8000))
+    print(result, m.get_size(), m.get_keys_and_values().length())
@@ -0,0 +1,396 @@
+# Name: Aubrey Floyd
+# Course: CS261 - Data Structures
+# Description: Approximate frequency counting for streams with too many distinct values to count
+#              exactly. CountMinSketch estimates any value's frequency from a fixed table of
+#              counters, and SpaceSaving tracks the top-k heavy hitters in k counters. Together
+#              they make ApproximateModeCounter and find_mode_approx, which return the same
+#              (modes, frequency) result as hash_map_sc.find_mode in memory set by the error
+#              bounds rather than by the number of distinct values.
+
+import heapq
+import math
+from array import array
+
+from a6_include import DynamicArray, get_hash_function, mix_hash
+from hash_map_cache import CacheNode, LFUPolicy
+import hash_map_sc
+
+
+class CountMinSketch:
+    def __init__(self,
+                 epsilon: float = 0.001,
+                 delta: float = 0.01,
+                 function: callable = 'fnv1a',
+                 seed: int = 0) -> None:
+        """
+        Initialize new CountMinSketch whose estimates exceed the true count by at most
+        epsilon times the total count, with probability at least 1 - delta
+        row i hashes a key with function, xors in a seed derived from seed and i, and
+        mixes the result; sketches merge only if they share function and seed
+        """
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon and delta must be between 0 and 1")
+
+        self._hash_function = get_hash_function(function)
+        self._width = math.ceil(math.e / epsilon)
+        self._depth = math.ceil(math.log(1 / delta))
+        self._seed = seed
+        self._row_seeds = [mix_hash((seed << 16) + row + 1) for row in range(self._depth)]
+        self._counts = array('Q', bytes(8 * self._width * self._depth))
+        self._total = 0
+
+    def get_width(self) -> int:
+        """
+        Return number of counters per row
+        """
+        return self._width
+
+    def get_depth(self) -> int:
+        """
+        Return number of rows
+        """
+        return self._depth
+
+    def get_total(self) -> int:
+        """
+        Return number of values counted, repeats included
+        """
+        return self._total
+
+    def get_error_bound(self) -> float:
+        """
+        Return the most an estimate may exceed the true count, with probability 1 - delta
+        """
+        return math.e / self._width * self._total
+
+    def get_memory(self) -> int:
+        """
+        Return size of the counter table in bytes
+        """
+        return self._counts.itemsize * len(self._counts)
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: object, count: int = 1) -> None:
+        """
+        Adds count to the counter value hashes to in every row. Hashes value once.
+        O(depth) time complexity.
+        :param value: value to count
+        :param count: number of occurrences
+        :return: none
+        """
+
+        counts = self._counts
+        for index in self._indices(value):
+            counts[index] += count
+        self._total += count
+
+
+    def estimate(self, value: object) -> int:
+        """
+        Estimates how many times value was counted: the smallest of its counters, never
+        less than the true count. O(depth) time complexity.
+        :param value: value to look up
+        :return: estimated count
+        """
+
+        counts = self._counts
+        return min(counts[index] for index in self._indices(value))
+
+
+    def merge(self, other: "CountMinSketch") -> None:
+        """
+        Adds the counters of a sketch built with the same parameters, such as one filled
+        by a parallel worker. O(width * depth) time complexity.
+        :param other: CountMinSketch to merge in
+        :return: none
+        """
+
+        if (other._width, other._depth, other._seed, other._hash_function) != \
+                (self._width, self._depth, self._seed, self._hash_function):
+            raise ValueError("sketches differ in size, seed or hash function")
+
+        counts = self._counts
+        for index, count in enumerate(other._counts):
+            counts[index] += count
+        self._total += other._total
+
+    # ------------------------------------------------------------------ #
+
+    def _indices(self, value: object) -> list:
+        """
+        Finds the counter of value in each row of the flat table.
+        :param value: value to place
+        :return: list of table indices, one per row
+        """
+
+        key_hash = self._hash_function(value)
+        width = self._width
+        return [row * width + ((mix_hash(key_hash ^ row_seed) * width) >> 64)
+                for row, row_seed in enumerate(self._row_seeds)]
+
+
+class SpaceSaving:
+    def __init__(self, k: int, function: callable = 'fnv1a') -> None:
+        """
+        Initialize new SpaceSaving summary tracking at most k values. Every value counted
+        more than 1/k of the total is tracked, and a tracked count exceeds the true one
+        by at most total / k.
+        Counters are CacheNodes in LFU frequency buckets, as in hash_map_cache, so the
+        smallest counter is found in O(1)
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1")
+
+        self._k = k
+        self._nodes = hash_map_sc.HashMap(k, function)
+        self._counters = LFUPolicy()
+        self._total = 0
+
+    def __iter__(self):
+        """
+        Return an iterator over the tracked values
+        """
+        return iter(self._nodes.keys())
+
+    def get_size(self) -> int:
+        """
+        Return number of tracked values
+        """
+        return self._nodes.get_size()
+
+    def get_total(self) -> int:
+        """
+        Return number of values counted, repeats included
+        """
+        return self._total
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: object) -> int:
+        """
+        Counts one occurrence of value. An untracked value arriving when all k counters
+        are in use takes over the smallest counter, inheriting its count as error.
+        O(1) average time complexity.
+        :param value: value to count
+        :return: tracked count of value
+        """
+
+        self._total += 1
+        node = self._nodes.get(value)
+        if node is not None:
+            self._counters.access(node)
+            return node.bucket.freq
+
+        if self._nodes.get_size() < self._k:
+            node = CacheNode(value, 0, 0, None)
+            self._nodes.put(value, node)
+            self._counters.insert(node)
+            return 1
+
+        # a node's value holds the over-count it inherited from the values it replaced
+        node = self._counters.victim()
+        self._nodes.remove(node.key)
+        node.key = value
+        node.value = node.bucket.freq
+        self._nodes.put(value, node)
+        self._counters.access(node)
+        return node.bucket.freq
+
+
+    def get_count(self, value: object) -> tuple:
+        """
+        Gets tracked count of value and how much of it may be over-count.
+        O(1) average time complexity.
+        :param value: value to look up
+        :return: tuple of (count, error), (0, 0) if value isn't tracked
+        """
+
+        node = self._nodes.get(value)
+        if node is None:
+            return 0, 0
+        return node.bucket.freq, node.value
+
+
+    def top_k(self, k: int) -> DynamicArray:
+        """
+        Finds the k values with the largest tracked counts, largest first.
+        O(K log k) time complexity for K tracked values.
+        :param k: number of values to return
+        :return: Dynamic Array of (value, count) tuples
+        """
+
+        top = DynamicArray()
+        for value, node in heapq.nlargest(k, self._nodes.items(),
+                                          key=lambda item: item[1].bucket.freq):
+            top.append((value, node.bucket.freq))
+        return top
+
+
+class ApproximateModeCounter:
+    def __init__(self,
+                 epsilon: float = 0.001,
+                 delta: float = 0.01,
+                 k: int = None,
+                 function: callable = 'fnv1a',
+                 seed: int = 0) -> None:
+        """
+        Initialize new ApproximateModeCounter: a CountMinSketch with the given epsilon and
+        delta, and a SpaceSaving summary of k counters, 1 / epsilon by default, so both
+        over-count by at most epsilon times the total
+        """
+        self._sketch = CountMinSketch(epsilon, delta, function, seed)
+        self._heavy = SpaceSaving(k if k is not None else math.ceil(1 / epsilon), function)
+
+    def get_total(self) -> int:
+        """
+        Return number of values counted, repeats included
+        """
+        return self._sketch.get_total()
+
+    def get_error_bound(self) -> float:
+        """
+        Return the most a count may exceed the true count, with probability 1 - delta
+        """
+        return self._sketch.get_error_bound()
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: object) -> None:
+        """
+        Counts one occurrence of value. O(depth) time complexity.
+        :param value: value to count
+        :return: none
+        """
+
+        self._sketch.add(value)
+        self._heavy.add(value)
+
+
+    def update(self, iterable) -> None:
+        """
+        Counts every value of an iterable, reading it lazily so a generator over a stream
+        is never held in memory. O(N * depth) time complexity.
+        :param iterable: iterable or generator of values
+        :return: none
+        """
+
+        for value in iterable:
+            self.add(value)
+
+
+    def get_count(self, value: object) -> int:
+        """
+        Estimates how many times value was counted. The sketch and a tracked counter both
+        only over-count, so the smaller of the two is used. O(depth) time complexity.
+        :param value: value to look up
+        :return: estimated count
+        """
+
+        estimate = self._sketch.estimate(value)
+        count, _ = self._heavy.get_count(value)
+        return min(estimate, count) if count else estimate
+
+
+    def get_modes(self) -> DynamicArray:
+        """
+        Finds the tracked value(s) with the highest estimated count.
+        :return: Dynamic Array of mode values
+        """
+
+        return self.get_modes_and_frequency()[0]
+
+
+    def get_mode_frequency(self) -> int:
+        """
+        Finds the highest estimated count of any value, 0 if nothing has been counted.
+        :return: estimated mode frequency
+        """
+
+        return self.get_modes_and_frequency()[1]
+
+
+    def get_modes_and_frequency(self) -> tuple:
+        """
+        Estimates every tracked value's count and keeps those with the highest, finding the
+        modes and their frequency in one pass. O(K * depth) time complexity for K tracked values.
+        :return: tuple of Dynamic Array of mode values and their estimated count
+        """
+
+        modes = DynamicArray()
+        mode_freq = 0
+        for value in self._heavy:
+            freq = self.get_count(value)
+            if freq > mode_freq:
+                mode_freq = freq
+                modes = DynamicArray()
+            if freq == mode_freq:
+                modes.append(value)
+        return modes, mode_freq
+
+
+    def top_k(self, k: int) -> DynamicArray:
+        """
+        Finds the k tracked values with the highest estimated counts, highest first.
+        :param k: number of values to return
+        :return: Dynamic Array of (value, count) tuples
+        """
+
+        estimates = [(value, self.get_count(value)) for value in self._heavy]
+        top = DynamicArray()
+        for pair in heapq.nlargest(k, estimates, key=lambda pair: pair[1]):
+            top.append(pair)
+        return top
+
+
+def find_mode_approx(values, epsilon: float = 0.001, delta: float = 0.01,
+                     k: int = None) -> tuple[DynamicArray, int]:
+    """
+    Finds approximate mode value(s) and frequency of a dynamic array or any iterable,
+    in memory set by epsilon, delta and k instead of the number of distinct values.
+    The frequency is at most epsilon times the input length too high, with probability
+    at least 1 - delta. O(N * depth) time complexity.
+    :param values: dynamic array, or iterable or generator of values
+    :param epsilon: relative error bound, see CountMinSketch
+    :param delta: failure probability, see CountMinSketch
+    :param k: number of heavy hitter counters, 1 / epsilon by default
+    :return: tuple containing dynamic array of mode value(s) and estimated frequency
+    """
+
+    if isinstance(values, DynamicArray):
+        da = values
+        values = (da.get_at_index(i) for i in range(da.length()))
+
+    counter = ApproximateModeCounter(epsilon, delta, k)
+    counter.update(values)
+    return counter.get_modes_and_frequency()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import random
+
+    print("\nfind_mode_approx example 1")
+    print("--------------------------")
+    test_cases = (
+        ["apple", "apple", "grape", "melon", "peach"],
+        ["Arch", "Manjaro", "Manjaro", "Mint", "Mint", "Mint", "Ubuntu", "Ubuntu", "Ubuntu"],
+    )
+    for case in test_cases:
+        da = DynamicArray(case)
+        mode, frequency = find_mode_approx(da)
+        print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nCountMinSketch / SpaceSaving example 1")
+    print("--------------------------------------")
+    rnd = random.Random(1)
+    stream = ['v' + str(int(rnd.paretovariate(1.2))) for _ in range(50000)]
+    counter = ApproximateModeCounter(epsilon=0.01)
+    counter.update(iter(stream))
+    exact = hash_map_sc.ModeCounter()
+    exact.update(stream)
+    print(counter.get_modes(), counter.get_mode_frequency(), exact.get_modes(),
+          exact.get_mode_frequency(), round(counter.get_error_bound()))
+    print(counter.top_k(3), exact.top_k(3))